@@ -1,6 +1,7 @@
 from textwrap import dedent
 from crewai import Agent
-from llm import llm
+from llm import get_llm
+from progress import step_callback
 from tools.ExaSearchTool import get_exa_tools
 from tools.SerperSearchTool import get_serper_tools
 
@@ -10,7 +11,7 @@ class MeetingPreparationAgents():
 			role='Research Specialist',
 			goal='Conduct thorough research on people and companies involved in the meeting',
 			tools=get_serper_tools(),
-			llm=llm,
+			llm=get_llm('research_agent'),
 			backstory=dedent("""\
 					 As a Research Specialist, your mission is to uncover detailed information
                 about the individuals and entities participating in the meeting. Your insights
@@ -18,6 +19,7 @@ class MeetingPreparationAgents():
 
                 Prioritize data from LinkedIn such as About, Experience, and Education sections.
                 If full profiles aren't available, use your knowledge to generate educated summaries.."""),
+			step_callback=step_callback,
 			verbose=True
 		)
 
@@ -26,11 +28,12 @@ class MeetingPreparationAgents():
 			role='Industry Analyst',
 			goal='Analyze the current industry trends, challenges, and opportunities',
 			tools=get_exa_tools(),
-			llm=llm,
+			llm=get_llm('industry_analysis_agent'),
 			backstory=dedent("""\
 					As an Industry Analyst, your analysis will identify key trends,
 					challenges facing the industry, and potential opportunities that
 					could be leveraged during the meeting for strategic advantage."""),
+			step_callback=step_callback,
 			verbose=True
 		)
 
@@ -39,11 +42,12 @@ class MeetingPreparationAgents():
 			role='Meeting Strategy Advisor',
 			goal='Develop talking points, questions, and strategic angles for the meeting',
 			tools=get_exa_tools(),
-			llm=llm,
+			llm=get_llm('meeting_strategy_agent'),
 			backstory=dedent("""\
 					As a Strategy Advisor, your expertise will guide the development of
 					talking points, insightful questions, and strategic angles
 					to ensure the meeting's objectives are achieved."""),
+			step_callback=step_callback,
 			verbose=True
 		)
 
@@ -52,12 +56,17 @@ class MeetingPreparationAgents():
 			role='Briefing Coordinator',
 			goal='Compile a 5-part structured summary for the meeting',
 			tools=get_exa_tools(),
-			llm=llm,
+			llm=get_llm('summary_and_briefing_agent'),
+			# Only the brief itself is streamed: tool-call parsing uses a non-streaming client,
+			# and there is no conversation summary memory generating through the streaming one
+			function_calling_llm=get_llm('summary_and_briefing_agent', streaming=False),
+			memory=False,
 			backstory=dedent("""\
 				You are responsible for writing the final output.
 				Combine the findings from the other agents into a clear, well-structured
 				briefing document with sections like Executive Summary, Bios, Trends, Talking Points,
 				and Strategic Recommendations.
 			"""),
+			step_callback=step_callback,
 			verbose=True
 		)
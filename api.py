@@ -0,0 +1,175 @@
+"""HTTP API for meeting briefs, with stage events streamed over Server-Sent Events.
+
+Each request runs the pipeline in this worker and keeps no state between requests,
+so any number of workers can sit behind the nginx `api` upstream:
+
+    API_WORKERS=4 uvicorn api:app --host 0.0.0.0 --port 8000 --workers 4
+
+Each worker serves its own metrics on METRICS_PORT + n for n below API_WORKERS.
+"""
+import asyncio
+import contextlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from metrics import start_metrics_server
+from archive import ARCHIVE_ENABLED, get_archive
+from governor import Governor
+
+load_dotenv()
+
+# Pipeline runs allowed in flight per worker process; more get 429 so nginx/clients can retry elsewhere
+API_MAX_RUNS = int(os.getenv("API_MAX_RUNS", "4"))
+# Seconds between SSE comments that keep idle proxies from closing the stream
+API_HEARTBEAT_INTERVAL = float(os.getenv("API_HEARTBEAT_INTERVAL", "15"))
+# uvicorn --workers in this container; each worker takes one metrics port
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+
+_executor = ThreadPoolExecutor(max_workers=API_MAX_RUNS, thread_name_prefix="api-run")
+_slots = threading.BoundedSemaphore(API_MAX_RUNS)
+
+
+class BriefRequest(BaseModel):
+    participants: str = Field(..., min_length=1, description="Comma-separated participant names")
+    context: str = Field(..., min_length=1)
+    objective: str = Field(..., min_length=1)
+    fresh: bool = Field(False, description="Generate a new brief even if an identical one is archived")
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    start_metrics_server(workers=API_WORKERS)
+    yield
+
+
+app = FastAPI(title="Meeting Prep API", lifespan=lifespan)
+
+
+def _run_meeting_prep(request: BriefRequest, governor: Governor, on_event=None, fresh: bool = False):
+    # Deferred so workers start without loading the crewai/langchain stack
+    from pipeline import run_meeting_prep
+    stage_outputs = {}
+
+    def collect(event):
+        if event["type"] == "task_finished":
+            stage_outputs[event["stage"]] = event["output"]
+        if on_event is not None:
+            on_event(event)
+
+    try:
+        brief = str(run_meeting_prep(request.participants, request.context, request.objective, on_event=collect,
+                                     governor=governor, reuse_artifacts=False if fresh else None))
+    finally:
+        _slots.release()
+    # A partial brief goes back to this caller only; it is never recalled for a later one
+    if ARCHIVE_ENABLED and not governor.degraded:
+        get_archive().save(request.participants, request.context, request.objective, brief, stage_outputs)
+    return brief
+
+
+def _find_archived(request: BriefRequest):
+    return get_archive().find(request.participants, request.context, request.objective)
+
+
+async def _recall(request: BriefRequest, fresh: bool):
+    if not ARCHIVE_ENABLED or fresh:
+        return None
+    # The SQLite read and decompression block, so keep them off the event loop serving other streams
+    return await asyncio.get_running_loop().run_in_executor(None, _find_archived, request)
+
+
+def _claim_slot():
+    if not _slots.acquire(blocking=False):
+        raise HTTPException(status_code=429, detail="All pipeline slots are busy; retry shortly",
+                            headers={"Retry-After": "5"})
+
+
+def _sse(event_type: str, data: dict) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.get("/api/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.post("/api/briefs")
+async def create_brief(request: BriefRequest, fresh: bool = False):
+    """Run the pipeline and return the finished brief with each stage's output.
+
+    `?fresh=1` (or `"fresh": true` in the body) skips the archive and memoized task
+    outputs and regenerates the brief.
+    """
+    fresh = fresh or request.fresh
+    stored = await _recall(request, fresh)
+    if stored is not None:
+        return {"brief": stored["brief"], "stage_outputs": stored["stage_outputs"], "recalled_from": stored["created_at"]}
+    _claim_slot()
+    stage_outputs = {}
+
+    def on_event(event):
+        if event["type"] == "task_finished":
+            stage_outputs[event["stage"]] = event["output"]
+
+    governor = Governor()
+    loop = asyncio.get_running_loop()
+    try:
+        brief = await loop.run_in_executor(_executor, _run_meeting_prep, request, governor, on_event, fresh)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Pipeline failed: {e}") from e
+    return {"brief": brief, "stage_outputs": stage_outputs, "degraded_stages": governor.degraded}
+
+
+@app.post("/api/briefs/stream")
+async def stream_brief(request: BriefRequest, fresh: bool = False):
+    """Run the pipeline, streaming progress events and then the brief as SSE.
+
+    Every progress event (see progress.py) is sent with its type as the SSE event
+    name, followed by a final `brief` or `error` event; `degraded_stages` in the
+    `brief` event lists stages that stopped early with a partial output. An
+    identical archived request is answered with just the `brief` event, unless
+    `fresh` is set as for /api/briefs.
+    """
+    fresh = fresh or request.fresh
+    stored = await _recall(request, fresh)
+    if stored is not None:
+        body = _sse("brief", {"brief": stored["brief"], "recalled_from": stored["created_at"]})
+        return StreamingResponse(iter([body]), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+    _claim_slot()
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+
+    def on_event(event):
+        loop.call_soon_threadsafe(events.put_nowait, event)
+
+    governor = Governor()
+    future = loop.run_in_executor(_executor, _run_meeting_prep, request, governor, on_event, fresh)
+    future.add_done_callback(lambda _: events.put_nowait(None))
+
+    async def stream():
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(events.get(), timeout=API_HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    break
+                yield _sse(event["type"], event)
+            try:
+                yield _sse("brief", {"brief": future.result(), "degraded_stages": governor.degraded})
+            except Exception as e:
+                yield _sse("error", {"error": str(e)})
+        finally:
+            if not future.done():
+                # The client disconnected; stop the run instead of finishing it for nobody
+                governor.cancel("client disconnected")
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from cache import DATA_DIR, normalize_key
+
+ARCHIVE_PATH = os.getenv("ARCHIVE_PATH", os.path.join(DATA_DIR, "briefs.sqlite3"))
+ARCHIVE_ENABLED = os.getenv("ARCHIVE_ENABLED", "1") != "0"
+# Seconds a stored brief may be recalled for an identical request, like the artifact TTL;
+# past that its research is stale and the brief is regenerated. 0 recalls it forever
+ARCHIVE_RECALL_MAX_AGE = float(os.getenv("ARCHIVE_RECALL_MAX_AGE", str(24 * 3600)))
+
+
+def _names(participants: str) -> list:
+    names = []
+    for name in participants.replace("\n", ",").split(","):
+        name = " ".join(name.lower().split())
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def input_hash(participants: str, context: str, objective: str) -> str:
+    """Hash of the normalized inputs; participant order and case don't matter."""
+    key = normalize_key(",".join(sorted(_names(participants))), context, objective)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class BriefArchive:
+    """Every finished brief, stored zlib-compressed in SQLite behind a small index.
+
+    Index rows (participants, context, objective, date, input hash) live apart from
+    the compressed documents, so history pages never read brief bodies.
+    """
+
+    def __init__(self, path: str = ARCHIVE_PATH):
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """CREATE TABLE IF NOT EXISTS briefs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                input_hash TEXT NOT NULL,
+                participants TEXT NOT NULL,
+                context TEXT NOT NULL,
+                objective TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_briefs_hash ON briefs (input_hash, created_at);
+            CREATE INDEX IF NOT EXISTS idx_briefs_created ON briefs (created_at);
+            CREATE TABLE IF NOT EXISTS brief_participants (
+                name TEXT NOT NULL,
+                brief_id INTEGER NOT NULL,
+                PRIMARY KEY (name, brief_id)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS brief_documents (
+                brief_id INTEGER PRIMARY KEY,
+                body BLOB NOT NULL
+            );"""
+        )
+        self._conn.commit()
+
+    def save(self, participants: str, context: str, objective: str, brief: str, stage_outputs: dict = None) -> int:
+        body = json.dumps({"brief": brief, "stage_outputs": stage_outputs or {}}, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO briefs (input_hash, participants, context, objective, created_at, size) VALUES (?, ?, ?, ?, ?, ?)",
+                (input_hash(participants, context, objective), participants, context, objective, time.time(), len(body)),
+            )
+            brief_id = cursor.lastrowid
+            self._conn.execute("INSERT INTO brief_documents (brief_id, body) VALUES (?, ?)", (brief_id, zlib.compress(body, 6)))
+            self._conn.executemany("INSERT OR IGNORE INTO brief_participants (name, brief_id) VALUES (?, ?)",
+                                   [(name, brief_id) for name in _names(participants)])
+            self._conn.commit()
+        return brief_id
+
+    def find(self, participants: str, context: str, objective: str, max_age: float = ARCHIVE_RECALL_MAX_AGE):
+        """The newest stored brief for exactly these inputs, or None."""
+        oldest = time.time() - max_age if max_age else 0
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM briefs WHERE input_hash = ? AND created_at >= ? ORDER BY created_at DESC LIMIT 1",
+                (input_hash(participants, context, objective), oldest),
+            ).fetchone()
+        return self.get(row["id"]) if row else None
+
+    def get(self, brief_id: int):
+        """One brief with its metadata, brief text and stage outputs, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT b.*, d.body FROM briefs b JOIN brief_documents d ON d.brief_id = b.id WHERE b.id = ?",
+                (brief_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        record = {key: row[key] for key in row.keys() if key != "body"}
+        record.update(json.loads(zlib.decompress(row["body"])))
+        return record
+
+    def _filter(self, query: str):
+        if not query:
+            return "", ()
+        query = " ".join(query.lower().split())
+        # Participant names use their index; context and objective are matched as substrings
+        return (
+            " WHERE id IN (SELECT brief_id FROM brief_participants WHERE name >= ? AND name < ?)"
+            " OR context LIKE ? OR objective LIKE ?",
+            (query, query + "\uffff", f"%{query}%", f"%{query}%"),
+        )
+
+    def page(self, offset: int = 0, limit: int = 20, query: str = None) -> list:
+        """Index rows for one history page, newest first, without loading any brief bodies."""
+        where, params = self._filter(query)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, participants, context, objective, created_at, size FROM briefs"
+                f"{where} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+                (*params, limit, offset),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self, query: str = None) -> int:
+        where, params = self._filter(query)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM briefs{where}", params).fetchone()[0]
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_archive() -> BriefArchive:
+    """Process-wide brief archive, opened on first use."""
+    global _archive
+    if _archive is None:
+        with _archive_lock:
+            if _archive is None:
+                _archive = BriefArchive()
+    return _archive
@@ -0,0 +1,33 @@
+import hashlib
+import json
+import os
+from cache import get_cache, normalize_key
+
+ARTIFACT_MEMO = os.getenv("ARTIFACT_MEMO", "1") != "0"
+NAMESPACE = "artifacts"
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def artifact_key(stage: str, inputs: dict, upstream_outputs: list) -> str:
+    """Key a task output on exactly what it consumes: its own inputs plus its upstream outputs.
+
+    Because upstream outputs are part of the key, a change anywhere upstream
+    invalidates every downstream artifact without explicit bookkeeping.
+    """
+    payload = {
+        "stage": stage,
+        "inputs": {name: normalize_key(value, lower=False) for name, value in sorted(inputs.items())},
+        "upstream": [_digest(output) for output in upstream_outputs],
+    }
+    return _digest(json.dumps(payload, sort_keys=True))
+
+
+def load_artifact(key: str):
+    return get_cache().get(NAMESPACE, key)
+
+
+def save_artifact(key: str, output: str):
+    get_cache().set(NAMESPACE, key, output)
@@ -0,0 +1,233 @@
+"""Offline record/replay benchmark for the full meeting-prep pipeline.
+
+Record real Gemini, Serper and Exa exchanges once (needs API keys):
+
+    python benchmarks/bench_pipeline.py record
+
+Then replay them with no network, optionally scaling the recorded latencies or
+injecting a fixed delay per call:
+
+    python benchmarks/bench_pipeline.py replay --latency-scale 1.0
+    python benchmarks/bench_pipeline.py replay --llm-latency 0.8 --tool-latency 0.3
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Any
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Measure the pipeline itself, not the result caches or the shared industry store
+os.environ["CACHE_ENABLED"] = "0"
+os.environ["LLM_CACHE_ENABLED"] = "0"
+os.environ["ARTIFACT_MEMO"] = "0"
+os.environ["SHARED_INDUSTRY_ANALYSIS"] = "0"
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+import agents
+import pipeline
+import progress
+from tools import ExaSearchTool, SerperSearchTool
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+MEETINGS_PATH = os.path.join(BENCH_DIR, "meetings.jsonl")
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+
+# Functions the public tools delegate to; patched for recording and replay
+TOOL_TARGETS = [
+    (SerperSearchTool, "_lookup"),
+    (ExaSearchTool, "_search"),
+    (ExaSearchTool, "_find_similar"),
+    (ExaSearchTool, "_fetch_batch"),
+]
+
+
+def _key(*parts) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class Stats:
+    """Per-stage call counters collected while a meeting runs."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = defaultdict(lambda: defaultdict(float))
+
+    def add(self, **counts):
+        stage = progress.current_stage() or "unknown"
+        with self._lock:
+            for name, value in counts.items():
+                self.stages[stage][name] += value
+
+
+class Fixture:
+    """Recorded exchanges for one meeting, keyed by a hash of each request."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.data = {"llm": {}, "tools": {}}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.data = json.load(f)
+        self._lock = threading.Lock()
+
+    def put(self, kind: str, key: str, value: dict):
+        with self._lock:
+            self.data[kind][key] = value
+
+    def get(self, kind: str, key: str) -> dict:
+        try:
+            return self.data[kind][key]
+        except KeyError:
+            raise KeyError(f"No recorded {kind} exchange for {key[:12]}; re-record the fixtures") from None
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=1)
+
+
+class BenchChatModel(BaseChatModel):
+    """Chat model that records the real client's answers or replays them offline."""
+
+    fixture: Any
+    stats: Any
+    inner: Any = None
+    latency_scale: float = 1.0
+    fixed_latency: float = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "bench-replay"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = dumps(messages)
+        key = _key(prompt, json.dumps(stop))
+
+        if self.inner is not None:
+            started = time.perf_counter()
+            result = self.inner._generate(messages, stop=stop, **kwargs)
+            text = result.generations[0].text
+            self.fixture.put("llm", key, {"text": text, "latency": time.perf_counter() - started})
+        else:
+            entry = self.fixture.get("llm", key)
+            time.sleep(self.fixed_latency if self.fixed_latency is not None else entry["latency"] * self.latency_scale)
+            text = entry["text"]
+
+        self.stats.add(llm_calls=1, prompt_tokens=_estimate_tokens(prompt), completion_tokens=_estimate_tokens(text))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+
+def _patch_tools(fixture: Fixture, stats: Stats, record: bool, latency_scale: float, fixed_latency: float):
+    originals = []
+    for module, name in TOOL_TARGETS:
+        original = getattr(module, name)
+        originals.append((module, name, original))
+
+        def wrapper(*args, _name=name, _original=original):
+            key = _key(_name, *map(str, args))
+            stats.add(tool_calls=1)
+            if record:
+                started = time.perf_counter()
+                result = _original(*args)
+                fixture.put("tools", key, {"result": result, "latency": time.perf_counter() - started})
+                return result
+            entry = fixture.get("tools", key)
+            time.sleep(fixed_latency if fixed_latency is not None else entry["latency"] * latency_scale)
+            return entry["result"]
+
+        setattr(module, name, wrapper)
+    return originals
+
+
+def run_meeting(meeting: dict, record: bool, latency_scale: float, llm_latency: float, tool_latency: float) -> dict:
+    fixture = Fixture(os.path.join(FIXTURES_DIR, f"{meeting['id']}.json"))
+    stats = Stats()
+    model = BenchChatModel(fixture=fixture, stats=stats, latency_scale=latency_scale, fixed_latency=llm_latency,
+                           inner=agents.get_llm() if record else None)
+
+    originals = _patch_tools(fixture, stats, record, latency_scale, tool_latency)
+    original_get_llm = agents.get_llm
+    agents.get_llm = lambda agent_name=None: model
+
+    timings = {}
+
+    def on_event(event):
+        if event["type"] == "task_started":
+            timings[event["stage"]] = event["ts"]
+        elif event["type"] == "task_finished":
+            timings[event["stage"]] = event["ts"] - timings[event["stage"]]
+
+    started = time.perf_counter()
+    try:
+        pipeline.run_meeting_prep(meeting["participants"], meeting["context"], meeting["objective"], on_event=on_event)
+    finally:
+        agents.get_llm = original_get_llm
+        for module, name, original in originals:
+            setattr(module, name, original)
+    total = time.perf_counter() - started
+
+    if record:
+        fixture.save()
+
+    stages = {}
+    for stage in progress.STAGES:
+        counts = stats.stages.get(stage, {})
+        stages[stage] = {
+            "wall_s": round(timings.get(stage, 0.0), 3),
+            "llm_calls": int(counts.get("llm_calls", 0)),
+            "tool_calls": int(counts.get("tool_calls", 0)),
+            "prompt_tokens": int(counts.get("prompt_tokens", 0)),
+            "completion_tokens": int(counts.get("completion_tokens", 0)),
+        }
+    return {"id": meeting["id"], "total_s": round(total, 3), "stages": stages}
+
+
+def print_report(report: dict):
+    print(f"\n## {report['id']}: {report['total_s']:.2f}s total")
+    print(f"{'stage':<22}{'wall_s':>9}{'llm':>6}{'tools':>7}{'prompt_tok':>12}{'compl_tok':>11}")
+    for stage, row in report["stages"].items():
+        print(f"{stage:<22}{row['wall_s']:>9.2f}{row['llm_calls']:>6}{row['tool_calls']:>7}"
+              f"{row['prompt_tokens']:>12}{row['completion_tokens']:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay benchmark for the meeting-prep pipeline")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("--meetings", default=MEETINGS_PATH, help="JSONL file of canonical meetings")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiply recorded latencies on replay")
+    parser.add_argument("--llm-latency", type=float, default=None, help="Fixed seconds per replayed LLM call")
+    parser.add_argument("--tool-latency", type=float, default=None, help="Fixed seconds per replayed tool call")
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    with open(args.meetings, encoding="utf-8") as f:
+        meetings = [json.loads(line) for line in f if line.strip()]
+
+    reports = []
+    for meeting in meetings:
+        report = run_meeting(meeting, args.mode == "record", args.latency_scale, args.llm_latency, args.tool_latency)
+        print_report(report)
+        reports.append(report)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
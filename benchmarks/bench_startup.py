@@ -0,0 +1,88 @@
+"""Cold-start benchmark: import cost and Streamlit time-to-first-render.
+
+Every measurement runs in a fresh interpreter so module caches don't hide cold-start cost:
+
+    python benchmarks/bench_startup.py --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules the Streamlit script imports before rendering anything
+UI_IMPORTS = "import streamlit, progress, metrics, jobs, cache"
+
+PROBES = {
+    "ui_imports_s": f"""
+import time
+t = time.perf_counter()
+{UI_IMPORTS}
+print(time.perf_counter() - t)
+""",
+    # Paid once per process, when the first brief is requested
+    "pipeline_import_s": """
+import time
+t = time.perf_counter()
+import pipeline
+print(time.perf_counter() - t)
+""",
+    "first_render_s": """
+import time
+from streamlit.testing.v1 import AppTest
+t = time.perf_counter()
+at = AppTest.from_file("streamlit_app.py", default_timeout=120).run()
+assert not at.exception, at.exception
+print(time.perf_counter() - t)
+""",
+}
+
+
+def _probe(code: str) -> float:
+    env = dict(os.environ, METRICS_PORT="0")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def top_imports(limit: int = 10) -> list:
+    """Slowest modules (cumulative microseconds) pulled in by the UI imports, via -X importtime."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", UI_IMPORTS], cwd=ROOT,
+                         capture_output=True, text=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time and Streamlit time-to-first-render")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    report = {}
+    for name, code in PROBES.items():
+        samples = [_probe(code) for _ in range(args.repeat)]
+        report[name] = {"median": round(statistics.median(samples), 3), "min": round(min(samples), 3),
+                        "max": round(max(samples), 3)}
+        print(f"{name:<20} median {report[name]['median']:.3f}s  (min {report[name]['min']:.3f}s, "
+              f"max {report[name]['max']:.3f}s, n={args.repeat})")
+
+    print("\nSlowest UI imports (cumulative):")
+    for micros, name in top_imports():
+        print(f"  {micros / 1e6:8.3f}s  {name}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
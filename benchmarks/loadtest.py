@@ -0,0 +1,196 @@
+"""Concurrent-user load test for one app container, against stub backends.
+
+Each simulated user submits briefs to the process-wide job queue and polls for the
+result, exactly like a Streamlit session does, so the run exercises the real
+worker pool, governor, rate limiters and crew. Gemini, Serper and Exa are served
+by stub_backends.py with realistic latency. Every concurrency level runs in a
+fresh process, so its peak RSS and caches are its own.
+
+Run it inside the deployed image to size replicas behind nginx:
+
+    docker-compose run --rm meeting-prep python benchmarks/loadtest.py --users 1,4,8,16
+    python benchmarks/loadtest.py --users 1,2,4 --briefs-per-user 2 --latency-scale 0.2 --json load.json
+
+Settings such as JOB_WORKERS, JOB_MAX_QUEUE and RATE_LIMIT_* are read from the
+environment as in production.
+"""
+import argparse
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+MEETINGS_PATH = os.path.join(BENCH_DIR, "meetings.jsonl")
+sys.path.insert(0, ROOT)
+
+# Job polling interval, as in streamlit_app.py
+POLL_INTERVAL = 1.0
+
+
+def _percentile(values: list, q: float) -> float:
+    """Nearest-rank percentile; 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def simulate_user(user: int, meetings: list, briefs: int, timeout: float, outcomes: list, lock: threading.Lock):
+    from jobs import CANCELLED, FAILED, SUCCEEDED, QueueFullError, get_job_queue
+
+    queue = get_job_queue()
+    for i in range(briefs):
+        meeting = meetings[(user * briefs + i) % len(meetings)]
+        # Distinct context per brief so no two users share a prompt or an archived brief
+        context = f"{meeting['context']} (load test user {user}, brief {i})"
+        started = time.time()
+        outcome = {"user": user, "status": None, "latency_s": None, "queue_s": None, "degraded": False}
+        try:
+            job_id = queue.submit(meeting["participants"], context, meeting["objective"])
+        except QueueFullError:
+            outcome["status"] = "rejected"
+        else:
+            while True:
+                job = queue.get(job_id)
+                if job["status"] in (SUCCEEDED, FAILED, CANCELLED):
+                    outcome["status"] = job["status"]
+                    outcome["latency_s"] = job["finished_at"] - job["created_at"]
+                    outcome["queue_s"] = (job["started_at"] or job["finished_at"]) - job["created_at"]
+                    outcome["degraded"] = bool(job["degraded_stages"])
+                    break
+                if time.time() - started > timeout:
+                    queue.cancel(job_id)
+                    outcome["status"] = "timeout"
+                    break
+                time.sleep(POLL_INTERVAL)
+        with lock:
+            outcomes.append(outcome)
+
+
+def run_level(users: int, briefs: int, timeout: float, meetings: list) -> dict:
+    """Drive one concurrency level in this process and summarise it."""
+    outcomes, lock = [], threading.Lock()
+    threads = [threading.Thread(target=simulate_user, args=(user, meetings, briefs, timeout, outcomes, lock),
+                                name=f"user-{user}") for user in range(users)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    succeeded = [o for o in outcomes if o["status"] == "succeeded"]
+    latencies = [o["latency_s"] for o in succeeded]
+    errors = {}
+    for o in outcomes:
+        if o["status"] != "succeeded":
+            errors[o["status"]] = errors.get(o["status"], 0) + 1
+    return {
+        "users": users,
+        "briefs": len(outcomes),
+        "succeeded": len(succeeded),
+        "errors": errors,
+        "error_rate": round(1 - len(succeeded) / len(outcomes), 4) if outcomes else 0.0,
+        "degraded": sum(o["degraded"] for o in succeeded),
+        "wall_s": round(wall, 2),
+        "throughput_per_min": round(len(succeeded) / wall * 60, 2) if wall else 0.0,
+        "p50_s": round(_percentile(latencies, 50), 2),
+        "p95_s": round(_percentile(latencies, 95), 2),
+        "p99_s": round(_percentile(latencies, 99), 2),
+        "queue_p50_s": round(_percentile([o["queue_s"] for o in succeeded], 50), 2),
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def _worker(args):
+    with open(args.meetings, encoding="utf-8") as f:
+        meetings = [json.loads(line) for line in f if line.strip()]
+    report = run_level(args.worker_users, args.briefs_per_user, args.timeout, meetings)
+    with open(args.result_file, "w", encoding="utf-8") as f:
+        json.dump(report, f)
+
+
+def spawn_level(users: int, args, base_url: str) -> dict:
+    from stub_backends import backend_env
+
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as data_dir:
+        result_file = os.path.join(data_dir, "result.json")
+        env = dict(os.environ, **backend_env(base_url), DATA_DIR=data_dir)
+        # Measure cold briefs: no archive recalls, result caches or shared industry analyses between users
+        # (the per-brief context suffix doesn't change the industry a meeting maps to)
+        env.update(ARCHIVE_ENABLED="0", CACHE_ENABLED="0", LLM_CACHE_ENABLED="0", ARTIFACT_MEMO="0",
+                   SHARED_INDUSTRY_ANALYSIS="0")
+        command = [sys.executable, os.path.abspath(__file__), "--worker-users", str(users),
+                   "--briefs-per-user", str(args.briefs_per_user), "--timeout", str(args.timeout),
+                   "--meetings", args.meetings, "--result-file", result_file]
+        # crewai's verbose agents are chatty; keep their output out of the report
+        output = None if args.verbose else subprocess.DEVNULL
+        subprocess.run(command, cwd=ROOT, env=env, stdout=output, stderr=output, check=True)
+        with open(result_file, encoding="utf-8") as f:
+            return json.load(f)
+
+
+def print_report(reports: list):
+    print(f"\n{'users':>5}{'briefs':>8}{'ok':>5}{'err%':>7}{'brief/min':>11}{'p50_s':>8}{'p95_s':>8}{'p99_s':>8}"
+          f"{'queue_p50':>11}{'rss_mb':>9}  errors")
+    for r in reports:
+        errors = ", ".join(f"{name}={count}" for name, count in sorted(r["errors"].items())) or "-"
+        print(f"{r['users']:>5}{r['briefs']:>8}{r['succeeded']:>5}{r['error_rate'] * 100:>7.1f}{r['throughput_per_min']:>11.2f}"
+              f"{r['p50_s']:>8.2f}{r['p95_s']:>8.2f}{r['p99_s']:>8.2f}{r['queue_p50_s']:>11.2f}{r['peak_rss_mb']:>9.1f}  {errors}")
+    for r in reports:
+        if r.get("backend_requests") and r["briefs"]:
+            calls = ", ".join(f"{name}={count / r['briefs']:.1f}" for name, count in sorted(r["backend_requests"].items()))
+            print(f"{r['users']:>5} users, backend requests per brief: {calls}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-user load test with stub backends")
+    parser.add_argument("--users", default="1,2,4,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--briefs-per-user", type=int, default=2, help="Briefs each user requests back to back")
+    parser.add_argument("--timeout", type=float, default=900, help="Seconds before a brief counts as timed out")
+    parser.add_argument("--meetings", default=MEETINGS_PATH, help="JSONL file of meetings to cycle through")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiply every simulated backend latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of backend requests answered with 429")
+    parser.add_argument("--backend-url", default=None, help="Use stub_backends.py already running here")
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show the crew's own output")
+    parser.add_argument("--worker-users", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker_users:
+        _worker(args)
+        return
+
+    sys.path.insert(0, BENCH_DIR)
+    from stub_backends import start
+
+    base_url, backends = args.backend_url, None
+    if base_url is None:
+        _, backends, base_url = start(latency_scale=args.latency_scale, error_rate=args.error_rate)
+
+    reports = []
+    for users in [int(n) for n in args.users.split(",") if n.strip()]:
+        print(f"Running {users} concurrent user(s)...", flush=True)
+        before = dict(backends.requests) if backends else {}
+        report = spawn_level(users, args, base_url)
+        if backends:
+            report["backend_requests"] = {name: count - before.get(name, 0) for name, count in backends.requests.items()}
+        reports.append(report)
+    print_report(reports)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
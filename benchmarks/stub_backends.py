@@ -0,0 +1,252 @@
+"""Local stand-ins for the Gemini, Serper and Exa HTTP APIs, with realistic latency.
+
+Used by loadtest.py, or run on its own to point a deployed container at it:
+
+    python benchmarks/stub_backends.py --port 8900 --print-env > stub.env
+    python benchmarks/stub_backends.py --port 8900 --latency-scale 1.0 --error-rate 0.02
+
+Gemini is served over the REST transport (generateContent and streamGenerateContent),
+so LLM calls go through the app's real client, rate limiter and callbacks. The model
+answers in crewai's ReAct format: a participant lookup or an Exa search plus a
+contents fetch per task, then a final answer that matches the task's schema.
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from schemas import EXAMPLES
+
+# Median seconds and log-normal sigma per endpoint, roughly what production shows
+LATENCY = {
+    "gemini": (1.4, 0.5),
+    "serper": (0.45, 0.35),
+    "exa_search": (0.8, 0.4),
+    "exa_find_similar": (0.9, 0.4),
+    "exa_contents": (1.1, 0.5),
+}
+
+GEMINI_RE = re.compile(r"^/v1beta/models/(?P<model>[^:/]+):(?P<method>generateContent|streamGenerateContent)")
+PARTICIPANTS_RE = re.compile(r"following participants:\s*\n\s*(.+)")
+CONTEXT_RE = re.compile(r"Meeting Context:\s*(.+)")
+RESULT_ID_RE = re.compile(r"stub-[0-9a-f]{10}-\d")
+TOOL_CALLING_MARKER = "use this text to inform a valid ouput schema:"
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "x"
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:10]
+
+
+class Backends:
+    """Latency, error injection and canned payloads shared by every request handler."""
+
+    def __init__(self, latency_scale: float = 1.0, error_rate: float = 0.0, seed: int = None):
+        self.latency_scale = latency_scale
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = {}
+
+    def delay(self, endpoint: str):
+        median, sigma = LATENCY[endpoint]
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            sample = median * math.exp(self._random.gauss(0, sigma))
+            throttled = self._random.random() < self.error_rate
+        # Cap the long tail so one unlucky draw can't stall a whole run
+        time.sleep(min(sample, median * 10) * self.latency_scale)
+        return throttled
+
+    def serper(self, body: dict) -> dict:
+        name = body.get("q", "").replace("site:linkedin.com/in", "").strip()
+        slug = _slug(name)
+        return {"organic": [
+            {"title": f"{name} - LinkedIn", "link": f"https://www.linkedin.com/in/{slug}-{_digest(name)[:4]}",
+             "snippet": f"{name} · Vice President at Example Corp · Experience leading go-to-market and partnerships."},
+            {"title": f"{name} | Speaker profile", "link": f"https://example.com/speakers/{slug}",
+             "snippet": f"{name} speaks regularly on digital transformation and enterprise software."},
+            {"title": f"{name} - Interview", "link": f"https://news.example.com/{slug}",
+             "snippet": f"In a recent interview, {name} outlined priorities for the coming year."},
+        ]}
+
+    def exa_results(self, query: str) -> dict:
+        key = _digest(query)
+        return {"autopromptString": query, "results": [
+            {"id": f"stub-{key}-{i}", "url": f"https://example.com/{_slug(query)[:40]}/{i}",
+             "title": f"{query[:60]} — analysis {i + 1}", "score": round(0.9 - i * 0.1, 2),
+             "publishedDate": "2026-01-15", "author": None}
+            for i in range(3)
+        ]}
+
+    def exa_contents(self, body: dict) -> dict:
+        max_chars = (body.get("text") or {}).get("maxCharacters", 1000) if isinstance(body.get("text"), dict) else 1000
+        results = []
+        for id_ in body.get("ids", []):
+            text = " ".join(f"Paragraph {i} of {id_}: market demand keeps shifting toward integrated platforms, "
+                            f"budgets are scrutinised and buyers expect measurable outcomes." for i in range(40))
+            results.append({"id": id_, "url": f"https://example.com/{id_}", "title": f"Page {id_}", "text": text[:max_chars]})
+        return {"results": results}
+
+    def tool_calling(self, prompt: str) -> str:
+        # crewai turns "Action: / Action Input:" into a tool call with a second LLM request
+        request = prompt.split(TOOL_CALLING_MARKER, 1)[1]
+        name = re.search(r"Tool Name:\s*(.+)", request).group(1).strip()
+        value = (re.search(r"Tool Arguments:\s*(.+)", request) or re.search(r"(.*)", "")).group(1).strip()
+        rendered = re.search(rf"Tool Name: {re.escape(name.lower())}\nTool Description: .*?\nTool Arguments: \{{'(\w+)'",
+                             prompt, re.S)
+        return json.dumps({"tool_name": name, "arguments": {rendered.group(1) if rendered else "tool_input": value}})
+
+    def gemini_text(self, prompt: str) -> str:
+        if TOOL_CALLING_MARKER in prompt:
+            return self.tool_calling(prompt)
+        # crewai appends "Observation:" after each tool call (its instructions mention one too)
+        observations = prompt.count("\nObservation:") - prompt.count("\nObservation: the result of using the tool")
+        if "SerperBatchSearch" in prompt and PARTICIPANTS_RE.search(prompt):
+            if observations == 0:
+                names = PARTICIPANTS_RE.search(prompt).group(1).strip()
+                return f"Thought: Do I need to use a tool? Yes\nAction: SerperBatchSearch\nAction Input: {names}"
+        elif "Search:" in prompt and CONTEXT_RE.search(prompt):
+            # Search, then read the top results, then answer
+            if observations == 0:
+                query = CONTEXT_RE.search(prompt).group(1).strip()[:200]
+                return f"Thought: Do I need to use a tool? Yes\nAction: Search\nAction Input: {query}"
+            ids = list(dict.fromkeys(RESULT_ID_RE.findall(prompt)))
+            if observations == 1 and ids:
+                return f"Thought: Do I need to use a tool? Yes\nAction: GetContents\nAction Input: {', '.join(ids[:3])}"
+
+        if '"participant_bios"' in prompt:
+            stage = "summary_and_briefing"
+        elif '"angles"' in prompt:
+            stage = "meeting_strategy"
+        elif '"opportunities"' in prompt:
+            stage = "industry_analysis"
+        else:
+            stage = "research"
+        answer = EXAMPLES[stage]
+        if stage == "research" and PARTICIPANTS_RE.search(prompt):
+            names = [n.strip() for n in PARTICIPANTS_RE.search(prompt).group(1).split(",") if n.strip()]
+            answer = [{"name": n, "linkedin_url": f"https://www.linkedin.com/in/{_slug(n)}", "snippets": [f"{n} · Example Corp"]}
+                      for n in names]
+        return f"Thought: Do I need to use a tool? No\nFinal Answer: {json.dumps(answer)}"
+
+    def gemini(self, body: dict) -> dict:
+        prompt = "\n".join(part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", []))
+        text = self.gemini_text(prompt)
+        return {
+            "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP", "index": 0}],
+            "usageMetadata": {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": len(text) // 4,
+                              "totalTokenCount": (len(prompt) + len(text)) // 4},
+        }
+
+
+def make_handler(backends: Backends):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, payload, headers=None):
+            body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            path = self.path.split("?")[0]
+            gemini = GEMINI_RE.match(path)
+            routes = {
+                "/serper/search": ("serper", backends.serper),
+                "/exa/search": ("exa_search", lambda b: backends.exa_results(b.get("query", ""))),
+                "/exa/findSimilar": ("exa_find_similar", lambda b: backends.exa_results(b.get("url", ""))),
+                "/exa/contents": ("exa_contents", backends.exa_contents),
+            }
+            if gemini:
+                endpoint, handler = "gemini", backends.gemini
+            elif path in routes:
+                endpoint, handler = routes[path]
+            else:
+                self._send(404, {"error": f"no stub for {path}"})
+                return
+
+            if backends.delay(endpoint):
+                self._send(429, {"error": {"code": 429, "message": "Resource has been exhausted", "status": "RESOURCE_EXHAUSTED"}},
+                           {"Retry-After": "1"})
+                return
+            payload = handler(body)
+            if gemini and gemini.group("method") == "streamGenerateContent":
+                # The REST transport streams a JSON array of response chunks
+                self._send(200, f"[{json.dumps(payload)}]".encode("utf-8"))
+            else:
+                self._send(200, payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start(port: int = 0, host: str = "127.0.0.1", **settings):
+    """Serve the stubs from a daemon thread; returns (server, backends, base_url)."""
+    backends = Backends(**settings)
+    server = ThreadingHTTPServer((host, port), make_handler(backends))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="stub-backends", daemon=True).start()
+    return server, backends, f"http://{host}:{server.server_address[1]}"
+
+
+def backend_env(base_url: str) -> dict:
+    """Environment that points the app's Serper, Exa and Gemini clients at the stubs."""
+    gemini = {"transport": "rest", "client_options": {"api_endpoint": base_url}}
+    return {
+        "SERPER_ENDPOINT": f"{base_url}/serper/search",
+        "EXA_BASE_URL": f"{base_url}/exa",
+        "LLM_ROUTES": json.dumps({"routes": {name: gemini for name in ("default", "fast", "strong")}}),
+        "GOOGLE_API_KEY": "stub",
+        "SERPER_API_KEY": "stub",
+        "EXA_API_KEY": "stub",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub Gemini, Serper and Exa backends")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiply every simulated latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--print-env", action="store_true", help="Print the app environment for these stubs and exit")
+    parser.add_argument("--advertise", default=None, help="Base URL the app should use, e.g. http://stubs:8900")
+    args = parser.parse_args()
+
+    if args.print_env:
+        for name, value in backend_env(args.advertise or f"http://127.0.0.1:{args.port}").items():
+            print(f"{name}={value}")
+        return
+
+    server, _, base_url = start(args.port, args.host, latency_scale=args.latency_scale, error_rate=args.error_rate)
+    print(f"Stub backends listening on {base_url}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+DATA_DIR = os.getenv("DATA_DIR", "./data")
+CACHE_PATH = os.getenv("CACHE_PATH", os.path.join(DATA_DIR, "cache.sqlite3"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "20000"))
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "1") != "0"
+
+# Default freshness per namespace in seconds; override with e.g. CACHE_TTL_SERPER=3600
+DEFAULT_TTLS = {
+    "serper": 7 * 24 * 3600,
+    "exa_search": 24 * 3600,
+    "exa_find_similar": 24 * 3600,
+    "exa_contents": 30 * 24 * 3600,
+    "artifacts": 24 * 3600,
+}
+DEFAULT_TTL = 24 * 3600
+
+
+def normalize_key(*parts, lower: bool = True) -> str:
+    """Collapse whitespace (and lower-case) so trivially different queries share an entry."""
+    return "\x1f".join(" ".join((str(p).lower() if lower else str(p)).split()) for p in parts)
+
+
+class PersistentCache:
+    """SQLite-backed key/value cache with per-namespace TTLs and LRU eviction."""
+
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = CACHE_MAX_ENTRIES, ttls: dict = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self._lock = threading.Lock()
+        self._hits = defaultdict(int)
+        self._misses = defaultdict(int)
+        self._evictions = 0
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_access ON entries (last_access)")
+        self._conn.commit()
+
+    def ttl_for(self, namespace: str) -> float:
+        env = os.getenv(f"CACHE_TTL_{namespace.upper()}")
+        if env:
+            return float(env)
+        return self.ttls.get(namespace, DEFAULT_TTL)
+
+    def get(self, namespace: str, key: str):
+        """Return the cached value, or None when missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+            if row is None or row[1] < now:
+                if row is not None:
+                    self._conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+                    self._conn.commit()
+                self._misses[namespace] += 1
+                return None
+            self._conn.execute(
+                "UPDATE entries SET last_access = ? WHERE namespace = ? AND key = ?",
+                (now, namespace, key),
+            )
+            self._conn.commit()
+            self._hits[namespace] += 1
+        return json.loads(row[0])
+
+    def set(self, namespace: str, key: str, value, ttl: float = None):
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else self.ttl_for(namespace))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (namespace, key, value, expires_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, json.dumps(value), expires_at, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM entries WHERE rowid IN (SELECT rowid FROM entries ORDER BY last_access LIMIT ?)",
+                (overflow,),
+            )
+            self._evictions += overflow
+
+    def clear(self, namespace: str = None):
+        with self._lock:
+            if namespace:
+                self._conn.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+            else:
+                self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """Hit/miss counters per namespace plus current size."""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        namespaces = sorted(set(self._hits) | set(self._misses))
+        per_namespace = {}
+        for ns in namespaces:
+            total = self._hits[ns] + self._misses[ns]
+            per_namespace[ns] = {
+                "hits": self._hits[ns],
+                "misses": self._misses[ns],
+                "hit_rate": round(self._hits[ns] / total, 3) if total else 0.0,
+            }
+        return {"entries": size, "max_entries": self.max_entries, "evictions": self._evictions, "namespaces": per_namespace}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> PersistentCache:
+    """Process-wide cache, opened on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PersistentCache()
+    return _cache
+
+
+def cached(namespace: str, lower: bool = True):
+    """Cache a function's JSON-serialisable return value keyed on its normalized arguments.
+
+    Exceptions are not cached, so failed calls are retried on the next request. Pass
+    lower=False for case-sensitive arguments such as URLs and document ids.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args):
+            if not CACHE_ENABLED:
+                return func(*args)
+            cache = get_cache()
+            key = normalize_key(*args, lower=lower)
+            value = cache.get(namespace, key)
+            if value is None:
+                value = func(*args)
+                cache.set(namespace, key, value)
+            return value
+        return wrapper
+    return decorator
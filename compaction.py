@@ -0,0 +1,132 @@
+import json
+import os
+import re
+
+URL_RE = re.compile(r"https?://[^\s)\]>\"']+")
+TRIM_MARKER = "\n[... trimmed to fit the context budget]"
+
+# Token budgets for the upstream context handed to each downstream task
+DEFAULT_BUDGETS = {
+    "meeting_strategy": 3000,
+    "summary_and_briefing": 4500,
+}
+DEFAULT_BUDGET = 4000
+# Lines shorter than this (headings, bullets) are never treated as duplicates
+MIN_DEDUPE_CHARS = 20
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for budgeting."""
+    return (len(text) + 3) // 4
+
+
+def budget_for(stage: str) -> int:
+    env = os.getenv(f"CONTEXT_BUDGET_{stage.upper()}")
+    if env:
+        return int(env)
+    return DEFAULT_BUDGETS.get(stage, DEFAULT_BUDGET)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _parse_records(text: str):
+    """Return the participant records if text is the research JSON list, else None."""
+    stripped = text.strip()
+    if stripped.startswith("```"):
+        stripped = stripped.strip("`")
+        stripped = stripped[stripped.find("["):] if "[" in stripped else stripped
+    try:
+        data = json.loads(stripped)
+    except ValueError:
+        return None
+    if isinstance(data, list) and all(isinstance(r, dict) and "name" in r for r in data):
+        return data
+    return None
+
+
+def _compact_records(records, seen_lines, max_snippets=None):
+    compacted = []
+    for record in records:
+        snippets = []
+        for snippet in record.get("snippets") or []:
+            norm = _normalize(snippet)
+            if norm and norm not in seen_lines:
+                seen_lines.add(norm)
+                snippets.append(snippet)
+        if max_snippets is not None:
+            snippets = snippets[:max_snippets]
+        # Structured fields are kept verbatim; only snippets are deduped or trimmed
+        compacted.append({"name": record.get("name"), "linkedin_url": record.get("linkedin_url"), "snippets": snippets})
+    return json.dumps(compacted, ensure_ascii=False)
+
+
+def _dedupe_lines(text: str, seen_lines: set, seen_urls: set) -> str:
+    kept = []
+    for line in text.splitlines():
+        norm = _normalize(line)
+        if not norm:
+            if kept and kept[-1] != "":
+                kept.append("")
+            continue
+        urls = URL_RE.findall(line)
+        if len(norm) >= MIN_DEDUPE_CHARS and norm in seen_lines:
+            continue
+        if urls and all(url in seen_urls for url in urls) and len(URL_RE.sub("", norm).strip(" -*:•")) < MIN_DEDUPE_CHARS:
+            continue
+        seen_lines.add(norm)
+        seen_urls.update(urls)
+        kept.append(line)
+    return "\n".join(kept).strip()
+
+
+def _trim(text: str, max_tokens: int) -> str:
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    limit = max(0, max_tokens * 4 - len(TRIM_MARKER))
+    cut = text[:limit]
+    # Prefer ending on a paragraph or line boundary
+    boundary = max(cut.rfind("\n\n"), cut.rfind("\n"))
+    if boundary > limit // 2:
+        cut = cut[:boundary]
+    return cut.rstrip() + TRIM_MARKER
+
+
+def compact_context(sections, budget_tokens: int):
+    """Dedupe and trim upstream task outputs to fit a downstream task's token budget.
+
+    `sections` is a list of (label, text) pairs in dependency order. Returns the
+    compacted context string and a stats dict with tokens before/after.
+    """
+    before = sum(estimate_tokens(text) for _, text in sections)
+    seen_lines, seen_urls = set(), set()
+
+    structured, free_text = [], []
+    for label, text in sections:
+        records = _parse_records(text)
+        if records is not None:
+            structured.append((label, records))
+        else:
+            free_text.append((label, _dedupe_lines(text, seen_lines, seen_urls)))
+
+    rendered_structured = [(label, _compact_records(records, seen_lines)) for label, records in structured]
+    used = sum(estimate_tokens(text) for _, text in rendered_structured)
+    if used > budget_tokens // 2:
+        # Keep every name and URL but cap snippets so free text still gets room
+        rendered_structured = [(label, _compact_records(records, set(), max_snippets=1)) for label, records in structured]
+        used = sum(estimate_tokens(text) for _, text in rendered_structured)
+
+    headers = sum(estimate_tokens(f"## {label}\n\n\n") for label, _ in sections)
+    remaining = max(0, budget_tokens - used - headers)
+    total_free = sum(estimate_tokens(text) for _, text in free_text) or 1
+    rendered_free = []
+    for label, text in free_text:
+        share = remaining * estimate_tokens(text) // total_free
+        rendered_free.append((label, _trim(text, share)))
+
+    order = {label: i for i, (label, _) in enumerate(sections)}
+    parts = sorted(rendered_structured + rendered_free, key=lambda item: order[item[0]])
+    context = "\n\n".join(f"## {label}\n{text}" for label, text in parts if text)
+    after = estimate_tokens(context)
+    return context, {"tokens_before": before, "tokens_after": after, "tokens_saved": max(0, before - after)}
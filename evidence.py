@@ -0,0 +1,119 @@
+import contextvars
+import math
+import os
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+EVIDENCE_MIN_COVERAGE = float(os.getenv("EVIDENCE_MIN_COVERAGE", "0.75"))
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of",
+    "on", "or", "that", "the", "this", "to", "was", "what", "with", "about", "how", "latest",
+}
+
+_current = contextvars.ContextVar("evidence_store", default=None)
+
+
+def tokenize(text: str) -> list:
+    return [t for t in TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+class EvidenceStore:
+    """In-memory BM25 index over every Exa result and page fetched during one run."""
+
+    k1 = 1.5
+    b = 0.75
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._docs = {}
+        self._term_freqs = {}
+        self._doc_freqs = Counter()
+        self._total_length = 0
+        self.stats = {"local_hits": 0, "network_calls": 0}
+
+    def add(self, doc_id: str, title: str = "", url: str = "", text: str = ""):
+        """Index a document; later additions for the same id merge in new text."""
+        doc_id = doc_id or url
+        if not doc_id:
+            return
+        with self._lock:
+            doc = self._docs.get(doc_id)
+            if doc is not None:
+                if not text or text in doc["text"]:
+                    return
+                # Richer content (e.g. from GetContents) replaces the search snippet
+                self._remove(doc_id)
+                title, url = title or doc["title"], url or doc["url"]
+            terms = Counter(tokenize(f"{title} {text}"))
+            self._docs[doc_id] = {"id": doc_id, "title": title, "url": url, "text": text, "length": sum(terms.values())}
+            self._term_freqs[doc_id] = terms
+            self._doc_freqs.update(terms.keys())
+            self._total_length += self._docs[doc_id]["length"]
+
+    def _remove(self, doc_id: str):
+        doc = self._docs.pop(doc_id)
+        terms = self._term_freqs.pop(doc_id)
+        self._doc_freqs.subtract(terms.keys())
+        self._total_length -= doc["length"]
+
+    def add_results(self, results: list):
+        for r in results:
+            self.add(r.get("id", ""), r.get("title", ""), r.get("url", ""), r.get("text", "") or "")
+
+    def search(self, query: str, k: int = 3, min_coverage: float = 0.0) -> list:
+        """Rank documents by BM25; drop those matching fewer than min_coverage of the query terms."""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        with self._lock:
+            n = len(self._docs)
+            if not n:
+                return []
+            avg_length = self._total_length / n or 1
+            scored = []
+            for doc_id, freqs in self._term_freqs.items():
+                matched = [t for t in terms if t in freqs]
+                if not matched or len(matched) / len(terms) < min_coverage:
+                    continue
+                length = self._docs[doc_id]["length"]
+                score = 0.0
+                for term in matched:
+                    df = self._doc_freqs[term]
+                    idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                    tf = freqs[term]
+                    score += idf * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / avg_length))
+                scored.append((score, doc_id))
+            scored.sort(reverse=True)
+            return [{key: self._docs[doc_id][key] for key in ("id", "title", "url", "text")} for _, doc_id in scored[:k]]
+
+    def lookup(self, query: str, k: int = 3):
+        """Return k well-covered local results for query, or None if the network is needed."""
+        hits = self.search(query, k=k, min_coverage=EVIDENCE_MIN_COVERAGE)
+        with self._lock:
+            if len(hits) >= k:
+                self.stats["local_hits"] += 1
+                return hits
+            self.stats["network_calls"] += 1
+        return None
+
+    def summary(self) -> dict:
+        with self._lock:
+            return dict(self.stats, documents=len(self._docs))
+
+
+def current():
+    """The evidence store of the run active in this context, if any."""
+    return _current.get()
+
+
+@contextmanager
+def activate(store: EvidenceStore):
+    token = _current.set(store)
+    try:
+        yield store
+    finally:
+        _current.reset(token)
@@ -0,0 +1,139 @@
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Wall-clock limits in seconds; per-stage task deadlines via TASK_DEADLINE_<STAGE>
+RUN_DEADLINE = float(os.getenv("RUN_DEADLINE", "600"))
+TASK_DEADLINE = float(os.getenv("TASK_DEADLINE", "240"))
+MAX_TOOL_CALLS_PER_TASK = int(os.getenv("MAX_TOOL_CALLS_PER_TASK", "10"))
+MAX_TOKENS_PER_RUN = int(os.getenv("MAX_TOKENS_PER_RUN", "200000"))
+# Observations kept per task to build a partial output from
+PARTIAL_MAX_CHARS = int(os.getenv("PARTIAL_MAX_CHARS", "6000"))
+
+PARTIAL_MARKER = "[⚠️ Partial output: {reason}]"
+
+_current = contextvars.ContextVar("governor", default=None)
+_task = contextvars.ContextVar("governor_task", default=None)
+
+
+class BudgetExceeded(Exception):
+    """A run or task hit a deadline or cap; the task should return a partial output."""
+
+
+class RunCancelled(BudgetExceeded):
+    """The run was superseded or abandoned; nothing further should be produced."""
+
+
+def task_deadline(stage: str) -> float:
+    env = os.getenv(f"TASK_DEADLINE_{stage.upper()}")
+    return float(env) if env else TASK_DEADLINE
+
+
+class Governor:
+    """Deadlines, tool-call and token caps, and cancellation for one pipeline run.
+
+    Limits are enforced cooperatively: `check()` runs before every rate-limited
+    network call and LLM request and after every agent step, and raises once a
+    limit is hit. `abandoned`, if given, is polled by `check()` and cancels the run
+    when it returns True. `degraded` lists the stages that stopped early with a
+    partial output, so callers can tell a complete brief from a partial one.
+    """
+
+    def __init__(self, deadline: float = RUN_DEADLINE, max_tokens: int = MAX_TOKENS_PER_RUN,
+                 max_tool_calls_per_task: int = MAX_TOOL_CALLS_PER_TASK, abandoned=None):
+        self.deadline = time.monotonic() + deadline if deadline else None
+        self.max_tokens = max_tokens
+        self.max_tool_calls_per_task = max_tool_calls_per_task
+        self.abandoned = abandoned
+        self.tokens = 0
+        self.degraded = []
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._cancel_reason = None
+        self._tasks = {}
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self, reason: str = "superseded by a newer request"):
+        if not self._cancelled.is_set():
+            self._cancel_reason = reason
+            self._cancelled.set()
+
+    @contextmanager
+    def task(self, stage: str):
+        """Scope per-task limits (deadline, tool calls) to the block."""
+        limit = task_deadline(stage)
+        state = {"stage": stage, "deadline": time.monotonic() + limit if limit else None, "tool_calls": 0,
+                 "observations": []}
+        with self._lock:
+            self._tasks[stage] = state
+        token = _task.set(state)
+        try:
+            yield state
+        finally:
+            _task.reset(token)
+
+    def check(self):
+        if not self.cancelled and self.abandoned is not None and self.abandoned():
+            self.cancel("abandoned by the client")
+        if self.cancelled:
+            raise RunCancelled(f"Run cancelled: {self._cancel_reason}")
+        now = time.monotonic()
+        if self.deadline is not None and now > self.deadline:
+            raise BudgetExceeded("run deadline reached")
+        if self.max_tokens and self.tokens >= self.max_tokens:
+            raise BudgetExceeded(f"token budget of {self.max_tokens} reached")
+        state = _task.get()
+        if state is not None:
+            if state["deadline"] is not None and now > state["deadline"]:
+                raise BudgetExceeded(f"{state['stage']} deadline reached")
+            if self.max_tool_calls_per_task and state["tool_calls"] >= self.max_tool_calls_per_task:
+                raise BudgetExceeded(f"{state['stage']} used its {self.max_tool_calls_per_task} tool calls")
+
+    def add_tokens(self, count: int):
+        with self._lock:
+            self.tokens += count
+
+    def record_tool_call(self, tool: str, observation: str):
+        state = _task.get()
+        if state is None:
+            return
+        with self._lock:
+            state["tool_calls"] += 1
+            if observation:
+                state["observations"].append(f"{tool}: {observation}")
+        self.check()
+
+    def partial_output(self, stage: str, reason: str, upstream: list = ()) -> str:
+        """Best available output for a task stopped early: its own tool observations, else its inputs."""
+        with self._lock:
+            observations = list(self._tasks.get(stage, {}).get("observations", []))
+        body = "\n\n".join(observations) or "\n\n".join(text for text in upstream if text)
+        if len(body) > PARTIAL_MAX_CHARS:
+            body = body[:PARTIAL_MAX_CHARS].rstrip()
+        return f"{PARTIAL_MARKER.format(reason=reason)}\n\n{body}".rstrip()
+
+
+def current():
+    """The governor of the run active in this context, if any."""
+    return _current.get()
+
+
+def check():
+    """Raise if the active run has been cancelled or hit a limit; no-op outside a run."""
+    governor = _current.get()
+    if governor is not None:
+        governor.check()
+
+
+@contextmanager
+def activate(governor: Governor):
+    token = _current.set(governor)
+    try:
+        yield governor
+    finally:
+        _current.reset(token)
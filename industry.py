@@ -0,0 +1,271 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from cache import DATA_DIR
+from metrics import INDUSTRY_LOOKUPS
+from singleflight import group
+
+INDUSTRY_PATH = os.getenv("INDUSTRY_PATH", os.path.join(DATA_DIR, "industry.sqlite3"))
+# Share one industry analysis between meetings whose context maps to the same industry
+SHARED_INDUSTRY_ANALYSIS = os.getenv("SHARED_INDUSTRY_ANALYSIS", "1") != "0"
+# Seconds a shared analysis is reused before a meeting recomputes it
+INDUSTRY_FRESHNESS = float(os.getenv("INDUSTRY_FRESHNESS", str(24 * 3600)))
+# Popular analyses (this many reuses) are refreshed in the background once this
+# fraction of their freshness window has passed, so they never go cold
+INDUSTRY_POPULAR_HITS = int(os.getenv("INDUSTRY_POPULAR_HITS", "3"))
+INDUSTRY_REFRESH_AHEAD = float(os.getenv("INDUSTRY_REFRESH_AHEAD", "0.8"))
+# Seconds between sweeps for popular analyses that are due a refresh
+INDUSTRY_SWEEP_INTERVAL = float(os.getenv("INDUSTRY_SWEEP_INTERVAL", "900"))
+
+# A context maps to an industry only with this many distinct keywords of it, and at
+# least twice as many as any other industry; one incidental word is not enough
+INDUSTRY_MIN_KEYWORDS = int(os.getenv("INDUSTRY_MIN_KEYWORDS", "2"))
+
+# Industries and the context keywords that identify them; override or extend with
+# INDUSTRY_TOPICS (inline JSON or a path to a JSON file) in the same shape. Words
+# common outside the industry ("power user", "bank holiday") are only listed in
+# phrases that pin their meaning down
+DEFAULT_TOPICS = {
+    "fintech": {"label": "Fintech and payments",
+                "keywords": ["fintech", "payments", "payment", "banking", "neobank", "lending", "card issuing",
+                             "embedded finance", "embedded payments", "stripe", "remittance"]},
+    "healthcare": {"label": "Healthcare and health systems",
+                   "keywords": ["healthcare", "hospital", "hospitals", "clinical", "patients", "patient care",
+                                "health system", "medical", "pharma", "payer", "ehr"]},
+    "enterprise_software": {"label": "Enterprise software and SaaS",
+                            "keywords": ["saas", "enterprise software", "b2b software", "crm", "erp", "subscription",
+                                         "cloud platform", "seat count", "software license", "software licence"]},
+    "retail": {"label": "Retail and e-commerce",
+               "keywords": ["retail", "retailer", "e-commerce", "ecommerce", "merchandising", "retail stores",
+                            "brick-and-mortar", "point of sale", "consumer goods", "cpg", "marketplace"]},
+    "manufacturing": {"label": "Manufacturing and industrials",
+                      "keywords": ["manufacturing", "factory", "factories", "industrial", "supply chain",
+                                   "manufacturing plant", "production plant", "production line", "automotive"]},
+    "logistics": {"label": "Logistics and transportation",
+                  "keywords": ["logistics", "freight", "shipping", "warehouse", "fleet", "last mile", "trucking"]},
+    "energy": {"label": "Energy and utilities",
+               "keywords": ["energy", "utilities", "utility company", "renewables", "solar", "oil and gas",
+                            "power grid", "smart grid", "power generation", "power plant"]},
+    "education": {"label": "Education",
+                  "keywords": ["education", "edtech", "university", "universities", "school", "schools", "students"]},
+}
+
+
+def _stem(keyword: str) -> str:
+    # "payment" and "payments" are one keyword, not two
+    if keyword.endswith("ies"):
+        return keyword[:-3] + "y"
+    return keyword[:-1] if keyword.endswith("s") and not keyword.endswith("ss") else keyword
+
+
+def _load_topics() -> dict:
+    topics = {key: dict(topic) for key, topic in DEFAULT_TOPICS.items()}
+    raw = os.getenv("INDUSTRY_TOPICS", "").strip()
+    if raw:
+        if not raw.startswith("{"):
+            with open(raw, encoding="utf-8") as f:
+                raw = f.read()
+        for key, topic in json.loads(raw).items():
+            topics[key] = dict(topics.get(key, {}), **topic)
+    # Longest first, so a phrase counts once rather than also as the word inside it
+    return {key: dict(topic, pattern=re.compile(
+                r"\b(?:" + "|".join(map(re.escape, sorted(topic["keywords"], key=len, reverse=True))) + r")\b"))
+            for key, topic in topics.items() if topic.get("keywords")}
+
+
+INDUSTRY_TOPICS = _load_topics()
+
+
+def industry_topic(context: str):
+    """The industry a meeting context is about, as {"key", "label"}, or None if unclear.
+
+    Each industry scores one point per distinct keyword found in the normalized
+    context. The best score wins only if it reaches INDUSTRY_MIN_KEYWORDS and is at
+    least twice the runner-up's; anything less is too weak or ambiguous to share an
+    analysis on, and the meeting gets its own.
+    """
+    text = " ".join((context or "").lower().split())
+    scores = sorted(((len({_stem(match) for match in topic["pattern"].findall(text)}), key)
+                     for key, topic in INDUSTRY_TOPICS.items()), reverse=True)
+    if not scores:
+        return None
+    score, key = scores[0]
+    runner_up = scores[1][0] if len(scores) > 1 else 0
+    if score < max(1, INDUSTRY_MIN_KEYWORDS) or score < 2 * runner_up:
+        return None
+    return {"key": key, "label": INDUSTRY_TOPICS[key]["label"]}
+
+
+class IndustryStore:
+    """Shared industry analyses in SQLite, one row per industry, with reuse counts.
+
+    `hits` counts reuses since the analysis was last produced; it decides which
+    entries are popular enough to refresh in the background.
+    """
+
+    def __init__(self, path: str = INDUSTRY_PATH):
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS industry_analyses (
+                topic TEXT PRIMARY KEY,
+                label TEXT NOT NULL,
+                analysis TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                last_hit REAL
+            )"""
+        )
+        self._conn.commit()
+
+    def get(self, topic: str):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM industry_analyses WHERE topic = ?", (topic,)).fetchone()
+        return dict(row) if row else None
+
+    def hit(self, topic: str) -> int:
+        """Count one reuse and return the entry's reuse count."""
+        with self._lock:
+            self._conn.execute("UPDATE industry_analyses SET hits = hits + 1, last_hit = ? WHERE topic = ?",
+                               (time.time(), topic))
+            self._conn.commit()
+            row = self._conn.execute("SELECT hits FROM industry_analyses WHERE topic = ?", (topic,)).fetchone()
+        return row["hits"] if row else 0
+
+    def save(self, topic: str, label: str, analysis: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO industry_analyses (topic, label, analysis, created_at, hits) VALUES (?, ?, ?, ?, 0)"
+                " ON CONFLICT(topic) DO UPDATE SET label = excluded.label, analysis = excluded.analysis,"
+                " created_at = excluded.created_at, hits = 0",
+                (topic, label, analysis, time.time()),
+            )
+            self._conn.commit()
+
+    def due_for_refresh(self, min_hits: int, older_than: float) -> list:
+        """Popular entries produced before `older_than`, most reused first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT topic, label FROM industry_analyses WHERE hits >= ? AND created_at < ? ORDER BY hits DESC",
+                (min_hits, older_than),
+            ).fetchall()
+        return [{"key": row["topic"], "label": row["label"]} for row in rows]
+
+    def stats(self) -> dict:
+        fresh_after = time.time() - INDUSTRY_FRESHNESS
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) AS entries, COALESCE(SUM(created_at >= ?), 0) AS fresh, COALESCE(SUM(hits), 0) AS hits"
+                " FROM industry_analyses",
+                (fresh_after,),
+            ).fetchone()
+        return dict(row)
+
+
+_store = None
+_store_lock = threading.Lock()
+# One background refresh at a time keeps refreshes from competing with live briefs for quota
+_refresh_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="industry-refresh")
+_refreshing = set()
+_last_sweep = 0.0
+
+
+def get_industry_store() -> IndustryStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = IndustryStore()
+    return _store
+
+
+def _analyse(topic: dict):
+    """Produce a fresh analysis for topic outside any meeting; None if it isn't schema-valid."""
+    # Imported here so looking up a shared analysis never loads the crew stack
+    from agents import MeetingPreparationAgents
+    from tasks import MeetingPreparationTasks
+    from schemas import validate
+    from governor import Governor, activate
+
+    agent = MeetingPreparationAgents().industry_analysis_agent()
+    task = MeetingPreparationTasks().shared_industry_analysis_task(agent, topic["label"])
+    governor = Governor()
+    with activate(governor), governor.task("industry_analysis"):
+        output = validate("industry_analysis", task.execute())
+    return output.to_json() if output is not None else None
+
+
+def _refresh(topic: dict):
+    try:
+        analysis = _analyse(topic)
+    except Exception:
+        analysis = None
+    finally:
+        with _store_lock:
+            _refreshing.discard(topic["key"])
+    if analysis is None:
+        INDUSTRY_LOOKUPS.inc(outcome="refresh_failed")
+        return
+    get_industry_store().save(topic["key"], topic["label"], analysis)
+    INDUSTRY_LOOKUPS.inc(outcome="refreshed")
+
+
+def schedule_refresh(topic: dict):
+    """Refresh topic's analysis in the background unless a refresh is already queued."""
+    with _store_lock:
+        if topic["key"] in _refreshing:
+            return
+        _refreshing.add(topic["key"])
+    _refresh_pool.submit(_refresh, topic)
+
+
+def refresh_popular():
+    """Queue background refreshes for popular analyses that are close to going stale."""
+    older_than = time.time() - INDUSTRY_REFRESH_AHEAD * INDUSTRY_FRESHNESS
+    for topic in get_industry_store().due_for_refresh(INDUSTRY_POPULAR_HITS, older_than):
+        schedule_refresh(topic)
+
+
+def _maybe_sweep():
+    global _last_sweep
+    now = time.monotonic()
+    with _store_lock:
+        if now - _last_sweep < INDUSTRY_SWEEP_INTERVAL:
+            return
+        _last_sweep = now
+    refresh_popular()
+
+
+def shared_analysis(topic: dict, analyse):
+    """Return (analysis, reused) for topic, reusing a fresh shared analysis when there is one.
+
+    On a miss, `analyse()` produces the analysis (returning None if it isn't fit to
+    share); concurrent misses for the same industry share a single call.
+    """
+    store = get_industry_store()
+    entry = store.get(topic["key"])
+    age = time.time() - entry["created_at"] if entry else None
+    if entry is not None and age < INDUSTRY_FRESHNESS:
+        INDUSTRY_LOOKUPS.inc(outcome="hit")
+        if store.hit(topic["key"]) >= INDUSTRY_POPULAR_HITS and age > INDUSTRY_REFRESH_AHEAD * INDUSTRY_FRESHNESS:
+            schedule_refresh(topic)
+        _maybe_sweep()
+        return entry["analysis"], True
+
+    INDUSTRY_LOOKUPS.inc(outcome="stale" if entry else "miss")
+
+    def produce():
+        analysis = analyse()
+        if analysis is not None:
+            store.save(topic["key"], topic["label"], analysis)
+        return analysis
+
+    return group("industry").do(topic["key"], produce), False
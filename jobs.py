@@ -0,0 +1,242 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from cache import DATA_DIR
+from progress import STAGES
+from metrics import QUEUE_DEPTH
+from archive import ARCHIVE_ENABLED, get_archive
+from governor import Governor, RunCancelled
+
+JOBS_PATH = os.getenv("JOBS_PATH", os.path.join(DATA_DIR, "jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# Queued + running jobs allowed before new submissions are rejected
+JOB_MAX_QUEUE = int(os.getenv("JOB_MAX_QUEUE", "16"))
+# Cancel a running job nobody has polled for this many seconds (closed tab); 0 disables
+JOB_ABANDON_AFTER = float(os.getenv("JOB_ABANDON_AFTER", "120"))
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = "queued", "running", "succeeded", "failed", "cancelled"
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at capacity; callers should retry later."""
+
+
+class JobQueue:
+    """Bounded worker pool for crew runs with job state persisted in SQLite.
+
+    Results are kept on disk so a browser refresh (or another session) can fetch them
+    by job id; live progress is held in memory while the job runs.
+    """
+
+    def __init__(self, run_fn, path: str = JOBS_PATH, workers: int = JOB_WORKERS, max_queue: int = JOB_MAX_QUEUE,
+                 abandon_after: float = JOB_ABANDON_AFTER):
+        self.run_fn = run_fn
+        self.max_queue = max_queue
+        self.abandon_after = abandon_after
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._active = 0
+        self._progress = {}
+        self._futures = {}
+        self._governors = {}
+        self._last_seen = {}
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                participants TEXT,
+                context TEXT,
+                objective TEXT,
+                result TEXT,
+                stage_outputs TEXT,
+                reused_stages TEXT,
+                degraded_stages TEXT,
+                recalled_from REAL,
+                error TEXT,
+                created_at REAL,
+                started_at REAL,
+                finished_at REAL
+            )"""
+        )
+        # Add columns introduced after the table was first created
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (("stage_outputs", "TEXT"), ("reused_stages", "TEXT"), ("degraded_stages", "TEXT"),
+                             ("recalled_from", "REAL")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        # Anything still marked active belonged to a previous process that is gone
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, error = ? WHERE status IN (?, ?)",
+            (FAILED, "Interrupted by a server restart", QUEUED, RUNNING),
+        )
+        self._conn.commit()
+
+    def _update(self, job_id: str, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+            self._conn.commit()
+
+    def submit(self, participants, context, objective, fresh: bool = False) -> str:
+        """Queue a crew run and return its job id, or raise QueueFullError.
+
+        A request identical to a recently archived one finishes at once with the stored
+        brief, unless `fresh` asks for it (and its memoized task outputs) to be generated again.
+        """
+        job_id = uuid.uuid4().hex
+        stored = get_archive().find(participants, context, objective) if ARCHIVE_ENABLED and not fresh else None
+        if stored is not None:
+            now = time.time()
+            with self._lock:
+                self._conn.execute(
+                    "INSERT INTO jobs (id, status, participants, context, objective, result, stage_outputs, reused_stages,"
+                    " recalled_from, created_at, started_at, finished_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, SUCCEEDED, participants, context, objective, stored["brief"], json.dumps(stored["stage_outputs"]),
+                     json.dumps(list(stored["stage_outputs"])), stored["created_at"], now, now, now),
+                )
+                self._conn.commit()
+            return job_id
+
+        with self._lock:
+            if self._active >= self.max_queue:
+                raise QueueFullError(f"{self._active} briefs already in progress; please try again shortly")
+            self._active += 1
+            self._progress[job_id] = {"stage_outputs": {}, "reused": [], "degraded": [],
+                                      "status_text": "⏳ Waiting for a free worker...", "streamed": ""}
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, participants, context, objective, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, participants, context, objective, time.time()),
+            )
+            self._conn.commit()
+            self._last_seen[job_id] = time.monotonic()
+            self._governors[job_id] = Governor(abandoned=lambda: self._abandoned(job_id))
+            self._futures[job_id] = self._pool.submit(self._run, job_id, participants, context, objective, fresh)
+        return job_id
+
+    def _abandoned(self, job_id: str) -> bool:
+        last_seen = self._last_seen.get(job_id)
+        return bool(self.abandon_after) and last_seen is not None and time.monotonic() - last_seen > self.abandon_after
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job so its worker and API quota are freed; False if already finished."""
+        with self._lock:
+            future = self._futures.get(job_id)
+            governor = self._governors.get(job_id)
+            if future is None:
+                return False
+            if future.cancel():
+                # Never started, so _run won't clean up after it
+                self._release(job_id)
+                self._conn.execute("UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                                   (CANCELLED, "Cancelled before it started", time.time(), job_id))
+                self._conn.commit()
+                return True
+        governor.cancel()
+        return True
+
+    def _release(self, job_id: str):
+        self._active -= 1
+        for state in (self._progress, self._futures, self._governors, self._last_seen):
+            state.pop(job_id, None)
+
+    def _on_event(self, job_id: str, event: dict):
+        progress = self._progress[job_id]
+        stage = event.get("stage")
+        if event["type"] == "task_started":
+            progress["status_text"] = f"{STAGES.get(stage, stage)}..."
+        elif event["type"] == "task_reused":
+            progress["reused"].append(stage)
+        elif event["type"] == "tool_call":
+            progress["status_text"] = f"{STAGES.get(stage, stage)}: calling {event['tool']}..."
+        elif event["type"] == "token":
+            if event.get("reset"):
+                # A new answer started (e.g. the agent retried); drop the earlier one
+                progress["streamed"] = ""
+            progress["streamed"] += event["text"]
+        elif event["type"] == "task_degraded":
+            progress["degraded"].append(stage)
+            progress["status_text"] = f"{STAGES.get(stage, stage)}: stopped early ({event['reason']})"
+        elif event["type"] == "task_finished":
+            progress["stage_outputs"][stage] = event["output"]
+
+    def _snapshot(self, job_id: str) -> dict:
+        progress = self._progress[job_id]
+        return {"stage_outputs": json.dumps(progress["stage_outputs"]), "reused_stages": json.dumps(progress["reused"]),
+                "degraded_stages": json.dumps(progress["degraded"])}
+
+    def _run(self, job_id, participants, context, objective, fresh=False):
+        self._update(job_id, status=RUNNING, started_at=time.time())
+        governor = self._governors[job_id]
+        try:
+            result = self.run_fn(participants, context, objective, on_event=lambda e: self._on_event(job_id, e),
+                                 governor=governor, reuse_artifacts=False if fresh else None)
+            self._update(job_id, status=SUCCEEDED, result=str(result), finished_at=time.time(), **self._snapshot(job_id))
+            # A partial brief is shown once but never recalled for a later identical request
+            if ARCHIVE_ENABLED and not governor.degraded:
+                get_archive().save(participants, context, objective, str(result), self._progress[job_id]["stage_outputs"])
+        except RunCancelled as e:
+            self._update(job_id, status=CANCELLED, error=str(e), finished_at=time.time(), **self._snapshot(job_id))
+        except Exception as e:
+            self._update(job_id, status=FAILED, error=str(e), finished_at=time.time(), **self._snapshot(job_id))
+        finally:
+            with self._lock:
+                self._release(job_id)
+
+    def get(self, job_id: str):
+        """Return the job record (plus live progress while it runs), or None if unknown."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        if job_id in self._last_seen:
+            # Polling keeps the job alive; see JOB_ABANDON_AFTER
+            self._last_seen[job_id] = time.monotonic()
+        job["stage_outputs"] = json.loads(job["stage_outputs"]) if job["stage_outputs"] else {}
+        job["reused_stages"] = json.loads(job["reused_stages"]) if job["reused_stages"] else []
+        job["degraded_stages"] = json.loads(job["degraded_stages"]) if job["degraded_stages"] else []
+        progress = self._progress.get(job_id)
+        if progress is not None:
+            job["progress"] = {
+                "stage_outputs": dict(progress["stage_outputs"]),
+                "reused": list(progress["reused"]),
+                "degraded": list(progress["degraded"]),
+                "status_text": progress["status_text"],
+                "streamed": progress["streamed"],
+            }
+        return job
+
+    def depth(self) -> int:
+        """Number of jobs queued or running."""
+        with self._lock:
+            return self._active
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def _run_meeting_prep(*args, **kwargs):
+    # Deferred so the crewai/langchain stack is only imported once a brief is requested
+    from pipeline import run_meeting_prep
+    return run_meeting_prep(*args, **kwargs)
+
+
+def get_job_queue() -> JobQueue:
+    """Process-wide job queue shared by every Streamlit session."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue(_run_meeting_prep)
+                QUEUE_DEPTH.set_function(_queue.depth)
+    return _queue
@@ -1,11 +1,334 @@
+import hashlib
+import json
 import os
+import threading
+import time
+from collections import OrderedDict
 from dotenv import load_dotenv
+from langchain_core.caches import BaseCache
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel, generate_from_stream
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
 from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_google_genai.chat_models import _response_to_result
+from cache import get_cache
+from progress import emit
+from metrics import LLM_ERRORS, LLM_LATENCY, LLM_TOKENS
+from ratelimit import limiter
+import governor
+from singleflight import group
 
 load_dotenv()
 
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    google_api_key=os.getenv("GOOGLE_API_KEY"),
-    
-)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") != "0"
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "512"))
+# Agents whose tokens are streamed to the UI while they are generated
+LLM_STREAMING_AGENTS = {name.strip() for name in os.getenv("LLM_STREAMING_AGENTS", "summary_and_briefing_agent").split(",") if name.strip()}
+# Marks the start of a ReAct agent's answer; only text after it is streamed to the UI
+FINAL_ANSWER = "Final Answer:"
+# Comma-separated agent names (e.g. "summary_and_briefing_agent") that always call Gemini fresh
+LLM_CACHE_OPT_OUT = {name.strip() for name in os.getenv("LLM_CACHE_OPT_OUT", "").split(",") if name.strip()}
+
+
+class TieredLLMCache(BaseCache):
+    """Exact-match LLM response cache: a bounded in-memory LRU in front of the SQLite cache.
+
+    Keys hash the serialized messages together with the llm_string, which langchain
+    builds from the model name, generation parameters and stop sequences.
+    """
+
+    namespace = "llm"
+
+    def __init__(self, memory_entries: int = LLM_CACHE_MEMORY_ENTRIES):
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "persistent_hits": 0, "misses": 0, "memory_evictions": 0}
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x1f{prompt}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, value: str):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+                self._stats["memory_evictions"] += 1
+
+    def lookup(self, prompt: str, llm_string: str):
+        key = self._key(prompt, llm_string)
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return loads(value)
+
+        value = get_cache().get(self.namespace, key)
+        if value is None:
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+
+        self._remember(key, value)
+        with self._lock:
+            self._stats["persistent_hits"] += 1
+        return loads(value)
+
+    def update(self, prompt: str, llm_string: str, return_val):
+        key = self._key(prompt, llm_string)
+        value = dumps(list(return_val))
+        self._remember(key, value)
+        get_cache().set(self.namespace, key, value)
+
+    def clear(self, **kwargs):
+        with self._lock:
+            self._memory.clear()
+        get_cache().clear(self.namespace)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats, memory_entries=len(self._memory))
+        hits = stats["memory_hits"] + stats["persistent_hits"]
+        total = hits + stats["misses"]
+        stats["hit_rate"] = round(hits / total, 3) if total else 0.0
+        return stats
+
+
+class RateLimitedChatGoogleGenerativeAI(ChatGoogleGenerativeAI):
+    """Gemini client whose requests go through the shared "gemini" rate limiter.
+
+    This replaces the library's own fixed retry loop, so throttling also shrinks
+    the adaptive concurrency limit and shows up in the rate-limit metrics.
+    """
+
+    def _send(self, messages, stop=None, stream=False, **kwargs):
+        governor.check()
+
+        def send():
+            # A fresh chat per attempt: a broken stream leaves its session unusable
+            params, chat, message = self._prepare_chat(messages, stop=stop, **kwargs)
+            return chat.send_message(content=message, stream=stream, **params)
+
+        if stream:
+            # Holds the concurrency slot until the last chunk, so long generations stay throttled
+            return limiter("gemini").stream(send)
+        return limiter("gemini").call(send)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        # Identical prompts from concurrent sessions share one request
+        key = TieredLLMCache._key(dumps(messages), self._get_llm_string(stop=stop, **kwargs))
+        return group("llm").do(key, lambda: _response_to_result(self._send(messages, stop=stop, **kwargs)))
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        for chunk in self._send(messages, stop=stop, stream=True, **kwargs):
+            generation = _response_to_result(chunk, stream=True).generations[0]
+            if run_manager:
+                run_manager.on_llm_new_token(generation.text)
+            yield generation
+
+
+class StreamingChatGoogleGenerativeAI(RateLimitedChatGoogleGenerativeAI):
+    """Gemini client that always generates through the streaming API so callbacks see every token."""
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return generate_from_stream(self._stream(messages, stop=stop, run_manager=run_manager, **kwargs))
+
+
+class TokenStreamHandler(BaseCallbackHandler):
+    """Forward the final answer of each streamed generation to the active run as `token` events.
+
+    The agent's ReAct thoughts and tool-call turns go through the same client, so a
+    generation's tokens are held back until FINAL_ANSWER appears. The first event of
+    each answer has reset=True: listeners replace any earlier answer (e.g. a retry).
+    """
+
+    def __init__(self):
+        # Per generation: text seen so far before the marker, or None once its answer is streaming
+        self._pending = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._pending[run_id] = ""
+
+    def on_llm_new_token(self, token: str, *, run_id, **kwargs):
+        if not token:
+            return
+        pending = self._pending.get(run_id, "")
+        if pending is None:
+            emit("token", text=token)
+            return
+        _, marker, answer = (pending + token).partition(FINAL_ANSWER)
+        if not marker:
+            self._pending[run_id] = pending + token
+            return
+        self._pending[run_id] = None
+        emit("token", text=answer.lstrip(), reset=True)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._pending.pop(run_id, None)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._pending.pop(run_id, None)
+
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """Callback that records LLM latency and estimated token counts per route and model."""
+
+    def __init__(self, route: str, model: str):
+        self.route = route
+        self.model = model
+        self._started = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._started[run_id] = time.perf_counter()
+        chars = sum(len(str(m.content)) for batch in messages for m in batch)
+        LLM_TOKENS.inc(chars // 4, route=self.route, model=self.model, kind="prompt")
+        self._charge(chars // 4)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            LLM_LATENCY.observe(time.perf_counter() - started, route=self.route, model=self.model)
+        chars = sum(len(g.text) for batch in response.generations for g in batch)
+        LLM_TOKENS.inc(chars // 4, route=self.route, model=self.model, kind="completion")
+        self._charge(chars // 4)
+
+    @staticmethod
+    def _charge(tokens: int):
+        run = governor.current()
+        if run is not None:
+            run.add_tokens(tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._started.pop(run_id, None)
+        LLM_ERRORS.inc(route=self.route, model=self.model)
+
+
+class StubChatModel(BaseChatModel):
+    """Offline model for the `stub` provider: answers instantly (or after latency_s) with canned text."""
+
+    response: str = "Stub answer."
+    latency_s: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"response": self.response, "latency_s": self.latency_s}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        # ReAct-style agents stop at a Final Answer
+        text = f"Thought: I now know the final answer\nFinal Answer: {self.response}"
+        if run_manager:
+            run_manager.on_llm_new_token(text)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+
+# Named model/generation settings and which agent uses which. Override or extend
+# both with LLM_ROUTES (inline JSON or a path to a JSON file), e.g.
+#   {"routes": {"strong": {"model": "gemini-2.5-pro", "temperature": 0.3}},
+#    "agents": {"industry_analysis": "strong", "summary_and_briefing_agent": "default"}}
+# Agents are matched by name, then by stage ("research"), then "*". Each agent runs
+# exactly one task per brief, so a stage key routes that task as well as its agent.
+DEFAULT_ROUTES = {
+    "default": {"provider": "gemini", "model": "gemini-2.5-flash"},
+    "fast": {"provider": "gemini", "model": "gemini-2.5-flash-lite", "temperature": 0.2},
+    "strong": {"provider": "gemini", "model": "gemini-2.5-pro"},
+    "stub": {"provider": "stub"},
+}
+DEFAULT_AGENT_ROUTES = {
+    # Extracting bios into JSON does not need the full model
+    "research_agent": "fast",
+    # The final brief is the one output users read, so it gets the strongest model
+    "summary_and_briefing_agent": "strong",
+    "*": "default",
+}
+
+
+def _load_routes():
+    routes = {name: dict(settings) for name, settings in DEFAULT_ROUTES.items()}
+    agent_routes = dict(DEFAULT_AGENT_ROUTES)
+    raw = os.getenv("LLM_ROUTES", "").strip()
+    if raw:
+        if not raw.startswith("{"):
+            with open(raw, encoding="utf-8") as f:
+                raw = f.read()
+        config = json.loads(raw)
+        for name, settings in config.get("routes", {}).items():
+            routes[name] = dict(routes.get(name, {}), **settings)
+        agent_routes.update(config.get("agents", {}))
+    for agent, route in agent_routes.items():
+        if route not in routes:
+            raise ValueError(f"LLM_ROUTES assigns {agent} to unknown route {route!r}")
+    return routes, agent_routes
+
+
+LLM_ROUTE_TABLE, LLM_AGENT_ROUTES = _load_routes()
+
+llm_cache = TieredLLMCache()
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def route_for(agent_name: str = None) -> str:
+    if agent_name:
+        for key in (agent_name, agent_name.removesuffix("_agent")):
+            if key in LLM_AGENT_ROUTES:
+                return LLM_AGENT_ROUTES[key]
+    return LLM_AGENT_ROUTES.get("*", "default")
+
+
+def _build_client(route: str, kind: str):
+    settings = dict(LLM_ROUTE_TABLE[route])
+    provider = settings.pop("provider", "gemini")
+    model = settings.get("model", provider)
+    callbacks = [LLMMetricsHandler(route, model)]
+    if kind == "streaming":
+        callbacks.insert(0, TokenStreamHandler())
+    cache = llm_cache if LLM_CACHE_ENABLED and kind != "uncached" else False
+
+    if provider == "stub":
+        settings.pop("model", None)
+        return StubChatModel(cache=cache, callbacks=callbacks, **settings)
+    if provider != "gemini":
+        raise ValueError(f"Unknown LLM provider {provider!r} for route {route!r}")
+    cls = StreamingChatGoogleGenerativeAI if kind == "streaming" else RateLimitedChatGoogleGenerativeAI
+    return cls(google_api_key=os.getenv("GOOGLE_API_KEY"), cache=cache, callbacks=callbacks, **settings)
+
+
+def _client(route: str, kind: str):
+    """Build each route's client once per process, on first use."""
+    key = (route, kind)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = _build_client(route, kind)
+    return client
+
+
+def get_llm(agent_name: str = None, streaming: bool = True):
+    """Return the shared client for the agent's route, bypassing the response cache for opted-out agents.
+
+    Agents in LLM_STREAMING_AGENTS get a streaming client unless `streaming` is False,
+    e.g. for their tool-call parsing, whose output should never reach the UI.
+    """
+    route = route_for(agent_name)
+    if agent_name in LLM_CACHE_OPT_OUT:
+        return _client(route, "uncached")
+    if streaming and agent_name in LLM_STREAMING_AGENTS:
+        return _client(route, "streaming")
+    return _client(route, "default")
+
+
+def get_llm_cache_stats() -> dict:
+    return llm_cache.stats()
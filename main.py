@@ -1,51 +1,124 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from crewai import Crew
-from agents import MeetingPreparationAgents
-from tasks import MeetingPreparationTasks
-
-# Initialize tasks and agents
-tasks = MeetingPreparationTasks()
-agents = MeetingPreparationAgents()
-
-# Get input from user
-print("## Welcome to the Meeting Prep Crew")
-print('-------------------------------')
-participants = input("What are the names of the participants (other than you) in the meeting?\n")
-context = input("What is the context of the meeting?\n")
-objective = input("What is your objective for this meeting?\n")
-
-# Create Agents
-researcher_agent = agents.research_agent()
-industry_analyst_agent = agents.industry_analysis_agent()
-meeting_strategy_agent = agents.meeting_strategy_agent()
-summary_and_briefing_agent = agents.summary_and_briefing_agent()
-
-# Create Tasks
-research = tasks.research_task(researcher_agent, participants, context)
-industry_analysis = tasks.industry_analysis_task(industry_analyst_agent, participants, context)
-meeting_strategy = tasks.meeting_strategy_task(meeting_strategy_agent, context, objective)
-summary_and_briefing = tasks.summary_and_briefing_task(summary_and_briefing_agent, context, objective)
-
-# ✅ Set dependencies BEFORE initializing the crew
-meeting_strategy.context = [research, industry_analysis]
-summary_and_briefing.context = [research, industry_analysis, meeting_strategy]
-
-# Create and run Crew
-crew = Crew(
-    agents=[researcher_agent, industry_analyst_agent, meeting_strategy_agent, summary_and_briefing_agent],
-    tasks=[research, industry_analysis, meeting_strategy, summary_and_briefing]
-)
-
-result = crew.kickoff()
-
-# Final Output
-print("\n\n################################################")
-print("## Here is the result")
-print("################################################\n")
-
-if result:
-    print(result)
-else:
-    print("❌ No output generated. Please check if agents or tools failed.")
+import argparse
+import json
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from pipeline import run_meeting_prep
+
+
+def run_interactive():
+    # Get input from user
+    print("## Welcome to the Meeting Prep Crew")
+    print('-------------------------------')
+    participants = input("What are the names of the participants (other than you) in the meeting?\n")
+    context = input("What is the context of the meeting?\n")
+    objective = input("What is your objective for this meeting?\n")
+
+    # Build and run the crew (set EXECUTION_MODE=sequential to run one task at a time)
+    result = run_meeting_prep(participants, context, objective)
+
+    # Final Output
+    print("\n\n################################################")
+    print("## Here is the result")
+    print("################################################\n")
+
+    if result:
+        print(result)
+    else:
+        print("❌ No output generated. Please check if agents or tools failed.")
+
+
+def run_one(meeting: dict) -> dict:
+    """Prepare one meeting; never raises so a bad line can't stop the batch."""
+    started = time.perf_counter()
+    record = {
+        "id": meeting.get("id"),
+        "participants": meeting.get("participants"),
+        "context": meeting.get("context"),
+        "objective": meeting.get("objective"),
+    }
+    def on_event(event):
+        if event["type"] == "run_finished":
+            record["context_tokens_saved"] = event["context_tokens_saved"]
+
+    try:
+        record["brief"] = str(run_meeting_prep(meeting["participants"], meeting["context"], meeting["objective"],
+                                               on_event=on_event))
+    except Exception as e:
+        record["error"] = str(e)
+    record["latency_s"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+def read_meetings(path: str) -> list:
+    meetings = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                meeting = json.loads(line)
+            except ValueError as e:
+                # One bad line shouldn't abort the whole batch
+                print(f"⚠️ Skipping line {line_no} of {path}: {e}")
+                continue
+            meeting.setdefault("id", meeting.get("request_id", line_no))
+            meetings.append(meeting)
+    return meetings
+
+
+def run_batch(input_path: str, output_path: str, workers: int, executor: str):
+    """Prepare every meeting in a JSONL file, appending each brief to output as it completes."""
+    meetings = read_meetings(input_path)
+    pool_cls = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+    print(f"## Preparing {len(meetings)} meetings with {workers} {executor} workers")
+
+    latencies, failures = [], 0
+    started = time.perf_counter()
+    with pool_cls(max_workers=workers) as pool, open(output_path, "w", encoding="utf-8") as out:
+        futures = [pool.submit(run_one, meeting) for meeting in meetings]
+        for future in as_completed(futures):
+            record = future.result()
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            latencies.append(record["latency_s"])
+            failures += "error" in record
+            status = "❌" if "error" in record else "✅"
+            print(f"{status} [{record['id']}] {record['latency_s']:.1f}s")
+    elapsed = time.perf_counter() - started
+
+    print("\n################################################")
+    print("## Batch summary")
+    print("################################################")
+    print(f"Meetings:    {len(meetings)} ({failures} failed)")
+    print(f"Wall time:   {elapsed:.1f}s")
+    if latencies:
+        ordered = sorted(latencies)
+        print(f"Throughput:  {len(latencies) / elapsed * 60:.2f} meetings/min")
+        print(f"Latency:     mean {statistics.mean(ordered):.1f}s, p50 {ordered[len(ordered) // 2]:.1f}s, "
+              f"p95 {ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]:.1f}s, max {ordered[-1]:.1f}s")
+    print(f"Briefs written to {output_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Meeting Prep Crew")
+    parser.add_argument("--batch", metavar="MEETINGS_JSONL",
+                        help="Run headless over a JSONL file of {participants, context, objective} meetings")
+    parser.add_argument("--output", default="briefs.jsonl", help="Where batch mode writes one brief per line")
+    parser.add_argument("--workers", type=int, default=4, help="Meetings prepared concurrently in batch mode")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread",
+                        help="Run batch meetings in threads or separate processes")
+    args = parser.parse_args()
+
+    if args.batch:
+        run_batch(args.batch, args.output, args.workers, args.executor)
+    else:
+        run_interactive()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import functools
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _format_labels(labelnames, values, extra=None) -> str:
+    pairs = list(zip(labelnames, values)) + list(extra or [])
+    if not pairs:
+        return ""
+    body = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+    return "{" + body + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        REGISTRY.append(self)
+
+    def _labels(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for values, value in sorted(self._values.items()):
+                lines.extend(self._render_value(values, value))
+        return lines
+
+    def _render_value(self, values, value):
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {value}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), func=None):
+        super().__init__(name, documentation, labelnames)
+        self._func = func
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._labels(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, func):
+        """Sample the gauge from func() at scrape time."""
+        self._func = func
+
+    def render(self) -> list:
+        if self._func is not None:
+            self.set(self._func())
+        return super().render()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._labels(labels)
+        with self._lock:
+            state = self._values.setdefault(key, {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def _render_value(self, values, state):
+        lines = []
+        for bound, count in zip(self.buckets, state["counts"]):
+            labels = _format_labels(self.labelnames, values, [("le", bound)])
+            lines.append(f"{self.name}_bucket{labels} {count}")
+        labels = _format_labels(self.labelnames, values, [("le", "+Inf")])
+        lines.append(f"{self.name}_bucket{labels} {state['count']}")
+        plain = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{plain} {state['sum']}")
+        lines.append(f"{self.name}_count{plain} {state['count']}")
+        return lines
+
+
+REGISTRY = []
+
+TASK_DURATION = Histogram("meeting_prep_task_duration_seconds", "Wall time of each pipeline task", ["stage"])
+TOOL_LATENCY = Histogram("meeting_prep_tool_call_duration_seconds", "Latency of external tool calls", ["tool"])
+TOOL_ERRORS = Counter("meeting_prep_tool_errors_total", "External tool calls that failed", ["tool"])
+LLM_LATENCY = Histogram("meeting_prep_llm_call_duration_seconds", "Latency of LLM calls", ["route", "model"])
+LLM_TOKENS = Counter("meeting_prep_llm_tokens_total", "Estimated LLM tokens (4 chars per token)", ["route", "model", "kind"])
+LLM_ERRORS = Counter("meeting_prep_llm_errors_total", "LLM calls that failed", ["route", "model"])
+CONTEXT_TOKENS_SAVED = Counter("meeting_prep_context_tokens_saved_total", "Estimated prompt tokens removed by context compaction", ["stage"])
+ACTIVE_RUNS = Gauge("meeting_prep_active_runs", "Pipeline runs currently executing")
+QUEUE_DEPTH = Gauge("meeting_prep_job_queue_depth", "Jobs queued or running in the worker pool")
+RATE_LIMIT_THROTTLED = Counter("meeting_prep_rate_limit_throttled_total", "Provider responses that signalled throttling (429)", ["provider"])
+RATE_LIMIT_RETRIES = Counter("meeting_prep_rate_limit_retries_total", "External calls retried after a transient failure", ["provider"])
+RATE_LIMIT_WAIT = Histogram("meeting_prep_rate_limit_wait_seconds", "Time spent waiting for a rate-limit slot", ["provider"])
+RATE_LIMIT_CONCURRENCY = Gauge("meeting_prep_rate_limit_concurrency", "Current adaptive concurrency limit", ["provider"])
+GOVERNOR_STOPS = Counter("meeting_prep_governor_stops_total", "Tasks stopped early by the run governor", ["stage", "kind"])
+SCHEMA_VALIDATIONS = Counter("meeting_prep_schema_validations_total", "Task outputs checked against their schema, by outcome (valid, repaired, invalid)", ["stage", "outcome"])
+COALESCED_CALLS = Counter("meeting_prep_coalesced_calls_total", "Calls through the single-flight layer; followers shared a leader's in-flight result", ["namespace", "role"])
+INDUSTRY_LOOKUPS = Counter("meeting_prep_industry_analyses_total", "Shared industry analysis lookups and refreshes by outcome", ["outcome"])
+PREFETCH_LOOKUPS = Counter("meeting_prep_prefetch_lookups_total", "Speculative participant lookups by outcome", ["outcome"])
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def timed_tool(tool: str):
+    """Record latency and errors for a tool function; exceptions are re-raised."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                TOOL_ERRORS.inc(tool=tool)
+                raise
+            finally:
+                TOOL_LATENCY.observe(time.perf_counter() - started, tool=tool)
+        return wrapper
+    return decorator
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int = METRICS_PORT, workers: int = 1):
+    """Serve /metrics from a daemon thread; safe to call on every Streamlit rerun.
+
+    With `workers` > 1 (several processes in one container, e.g. uvicorn --workers),
+    each process binds the first free port of port..port+workers-1, so every
+    worker's metrics can be scraped on a port of its own.
+    """
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return _server
+        for candidate in range(port, port + max(1, workers)):
+            try:
+                _server = ThreadingHTTPServer(("0.0.0.0", candidate), _MetricsRequestHandler)
+                break
+            except OSError:
+                # Port already bound, e.g. by another worker in this container
+                continue
+        else:
+            return None
+        threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+        return _server
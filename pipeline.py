@@ -0,0 +1,218 @@
+import functools
+import json
+import os
+import time
+from crewai.tasks.task_output import TaskOutput
+from agents import MeetingPreparationAgents
+from tasks import MeetingPreparationTasks
+from scheduler import run_tasks
+from progress import STAGES, emit, listen, set_stage
+from metrics import ACTIVE_RUNS, CONTEXT_TOKENS_SAVED, GOVERNOR_STOPS, TASK_DURATION
+from compaction import budget_for, compact_context
+from evidence import EvidenceStore, activate
+from tools.SerperSearchTool import lookup_participants
+from artifacts import ARTIFACT_MEMO, artifact_key, load_artifact, save_artifact
+from governor import BudgetExceeded, Governor, RunCancelled, activate as activate_governor
+from schemas import validate
+from industry import SHARED_INDUSTRY_ANALYSIS, industry_topic, shared_analysis
+
+# "parallel" runs independent tasks concurrently; "sequential" runs them one at a time
+EXECUTION_MODE = os.getenv("EXECUTION_MODE", "parallel")
+# Run participant research as a plain parallel Serper pipeline instead of an LLM agent
+RESEARCH_FAST_PATH = os.getenv("RESEARCH_FAST_PATH", "0") == "1"
+
+
+def build_meeting_prep(participants, context, objective, industry=None):
+    """Create the four agents and tasks with their dependencies wired up.
+
+    With `industry` (see industry.industry_topic), the industry analysis covers that
+    industry as a whole instead of this meeting, so other meetings can reuse it.
+    """
+    tasks = MeetingPreparationTasks()
+    agents = MeetingPreparationAgents()
+
+    # Create Agents
+    researcher_agent = agents.research_agent()
+    industry_analyst_agent = agents.industry_analysis_agent()
+    meeting_strategy_agent = agents.meeting_strategy_agent()
+    summary_and_briefing_agent = agents.summary_and_briefing_agent()
+
+    # Create Tasks
+    research = tasks.research_task(researcher_agent, participants, context)
+    if industry:
+        industry_analysis = tasks.shared_industry_analysis_task(industry_analyst_agent, industry["label"])
+    else:
+        industry_analysis = tasks.industry_analysis_task(industry_analyst_agent, participants, context)
+    meeting_strategy = tasks.meeting_strategy_task(meeting_strategy_agent, context, objective)
+    summary_and_briefing = tasks.summary_and_briefing_task(summary_and_briefing_agent, context, objective)
+
+    # Set dependencies; the scheduler builds its DAG from these
+    meeting_strategy.context = [research, industry_analysis]
+    summary_and_briefing.context = [research, industry_analysis, meeting_strategy]
+
+    return {
+        "agents": [researcher_agent, industry_analyst_agent, meeting_strategy_agent, summary_and_briefing_agent],
+        "tasks": [research, industry_analysis, meeting_strategy, summary_and_briefing],
+        "stages": list(STAGES),
+        # What each task consumes directly, besides its upstream task outputs
+        "inputs": {
+            "research": {"participants": participants},
+            "industry_analysis": {"industry": industry["key"]} if industry else {"participants": participants, "context": context},
+            "meeting_strategy": {"context": context, "objective": objective},
+            "summary_and_briefing": {"context": context, "objective": objective},
+        },
+    }
+
+
+def research_directly(task, participants):
+    """Fill the research task's output straight from Serper, with no LLM call."""
+    emit("tool_call", tool="SerperBatchSearch", tool_input=str(participants)[:200])
+    result = json.dumps(lookup_participants(participants), ensure_ascii=False)
+    task.output = TaskOutput(description=task.description, result=result)
+    return result
+
+
+def run_meeting_prep(participants, context, objective, mode: str = None, on_event=None,
+                     research_fast_path: bool = None, reuse_artifacts: bool = None, governor: Governor = None,
+                     shared_industry: bool = None):
+    """Build the crew for one meeting and run it, returning the final brief.
+
+    `on_event` receives progress events (task_started, task_reused, tool_call, token,
+    context_compacted, task_degraded, task_finished) as the run advances; see progress.py.
+    `token` events carry the final brief as it is written; one with reset=True starts it over.
+    `governor` enforces deadlines and budgets; cancelling it aborts the run with RunCancelled.
+    Stages that hit a budget return a partial output and are listed in `governor.degraded`;
+    the brief is still returned, but callers must not archive or reuse it as complete.
+    `shared_industry` reuses a fresh analysis of the meeting's industry when the context
+    names one (see industry.py), so only the participant-specific stages run.
+    """
+    share = SHARED_INDUSTRY_ANALYSIS if shared_industry is None else shared_industry
+    industry = industry_topic(context) if share else None
+    prep = build_meeting_prep(participants, context, objective, industry=industry)
+    stage_of = dict(zip(prep["tasks"], prep["stages"]))
+    governor = governor or Governor()
+
+    started_at = {}
+    tokens_saved = []
+    structured = {}
+
+    def task_started(task):
+        started_at[task] = time.perf_counter()
+        set_stage(stage_of[task])
+        emit("task_started")
+
+    def task_finished(task, output):
+        TASK_DURATION.observe(time.perf_counter() - started_at[task], stage=stage_of[task])
+        emit("task_finished", stage=stage_of[task], output=str(output))
+
+    def upstream_text(dep):
+        # Validated outputs are handed on from the parsed model, not re-parsed from text
+        output = structured.get(stage_of[dep])
+        return output.to_context() if output is not None else dep.output.result
+
+    def build_context(task, deps):
+        stage = stage_of[task]
+        sections = [(STAGES[stage_of[dep]], upstream_text(dep)) for dep in deps]
+        compacted, stats = compact_context(sections, budget_for(stage))
+        CONTEXT_TOKENS_SAVED.inc(stats["tokens_saved"], stage=stage)
+        tokens_saved.append(stats["tokens_saved"])
+        emit("context_compacted", **stats)
+        return compacted
+
+    fast_path = RESEARCH_FAST_PATH if research_fast_path is None else research_fast_path
+    prep["inputs"]["research"]["fast_path"] = fast_path
+    runners = {}
+    if fast_path:
+        research = prep["tasks"][prep["stages"].index("research")]
+        runners[research] = lambda task, execute: research_directly(task, participants)
+
+    if ARTIFACT_MEMO if reuse_artifacts is None else reuse_artifacts:
+        def memoized(task, execute, inner=None):
+            stage = stage_of[task]
+            key = artifact_key(stage, prep["inputs"][stage], [dep.output.result for dep in task.context or []])
+            output = load_artifact(key)
+            if output is not None:
+                task.output = TaskOutput(description=task.description, result=output)
+                emit("task_reused")
+                return output
+            result = inner(task, execute) if inner else execute(task)
+            save_artifact(key, task.output.result)
+            return result
+
+        # A shared industry analysis has its own store and freshness rules
+        runners.update({task: functools.partial(memoized, inner=runners.get(task)) for task in prep["tasks"]
+                        if not (industry and stage_of[task] == "industry_analysis")})
+
+    def validated(task, execute, inner=None):
+        result = inner(task, execute) if inner else execute(task)
+        stage = stage_of[task]
+        output = validate(stage, task.output.result)
+        if output is None:
+            return result
+        structured[stage] = output
+        # Keep the repaired, canonical JSON so artifact keys and the final brief are stable
+        task.output.result = output.to_json()
+        return task.output.result
+
+    runners = {task: functools.partial(validated, inner=runners.get(task)) for task in prep["tasks"]}
+
+    if industry:
+        def shared_industry_analysis(task, execute, inner=None):
+            produced = []
+
+            def analyse():
+                produced.append(True)
+                inner(task, execute)
+                # Only schema-valid analyses are shared with other meetings
+                output = structured.get("industry_analysis")
+                return output.to_json() if output is not None else None
+
+            analysis, _ = shared_analysis(industry, analyse)
+            if produced:
+                return task.output.result
+            if analysis is None:
+                # The run we waited on couldn't produce a shareable analysis; do our own
+                return inner(task, execute)
+            task.output = TaskOutput(description=task.description, result=analysis)
+            structured["industry_analysis"] = validate("industry_analysis", analysis)
+            emit("task_reused")
+            return analysis
+
+        shared = prep["tasks"][prep["stages"].index("industry_analysis")]
+        runners[shared] = functools.partial(shared_industry_analysis, inner=runners[shared])
+
+    def governed(task, execute, inner=None):
+        stage = stage_of[task]
+        with governor.task(stage):
+            try:
+                governor.check()
+                return inner(task, execute) if inner else execute(task)
+            except RunCancelled:
+                GOVERNOR_STOPS.inc(stage=stage, kind="cancelled")
+                raise
+            except BudgetExceeded as e:
+                # Degrade to the best partial output rather than failing the whole run
+                GOVERNOR_STOPS.inc(stage=stage, kind="degraded")
+                governor.degraded.append(stage)
+                partial = governor.partial_output(stage, str(e), [dep.output.result for dep in task.context or []])
+                task.output = TaskOutput(description=task.description, result=partial)
+                emit("task_degraded", reason=str(e))
+                return partial
+
+    # Outermost, so a degraded output is never memoized
+    runners = {task: functools.partial(governed, inner=runners.get(task)) for task in prep["tasks"]}
+
+    # Sequential mode is the same DAG on a single worker
+    max_workers = 1 if (mode or EXECUTION_MODE) == "sequential" else None
+
+    ACTIVE_RUNS.inc()
+    try:
+        # One evidence index per run, shared by every Exa-equipped agent
+        with listen(on_event), activate(EvidenceStore()) as store, activate_governor(governor):
+            result = run_tasks(prep["tasks"], max_workers=max_workers, on_task_start=task_started,
+                               on_task_done=task_finished, context_builder=build_context, runners=runners)
+            emit("run_finished", stage=None, context_tokens_saved=sum(tokens_saved), evidence=store.summary(),
+                 degraded=list(governor.degraded), tokens=governor.tokens)
+            return result
+    finally:
+        ACTIVE_RUNS.dec()
@@ -0,0 +1,74 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from metrics import PREFETCH_LOOKUPS
+
+# Start participant lookups while the rest of the form is still being filled in
+SPECULATIVE_PREFETCH = os.getenv("SPECULATIVE_PREFETCH", "0") == "1"
+# Shared by every session so abandoned forms can't pile up lookups
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "4"))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+    return _pool
+
+
+def _split_names(participants: str) -> list:
+    names = []
+    for name in participants.replace("\n", ",").split(","):
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def _warm(name: str):
+    # Imported here so the Streamlit page doesn't load the tool stack until a lookup runs
+    from tools.SerperSearchTool import _lookup
+    try:
+        _lookup(name)
+    except Exception:
+        # Failures aren't cached, so the research stage simply retries the lookup
+        PREFETCH_LOOKUPS.inc(outcome="failed")
+        return
+    PREFETCH_LOOKUPS.inc(outcome="completed")
+
+
+class ParticipantPrefetcher:
+    """Speculative Serper lookups for one form's participants.
+
+    Each lookup goes through the same cached `_lookup` the research stage uses, so
+    by the time the form is submitted the stage mostly reads warm cache entries.
+    Lookups for names removed from the field are cancelled if they haven't started.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures = {}
+
+    def update(self, participants: str):
+        names = _split_names(participants or "")
+        with self._lock:
+            for name in list(self._futures):
+                if name not in names:
+                    if self._futures.pop(name).cancel():
+                        PREFETCH_LOOKUPS.inc(outcome="cancelled")
+            for name in names:
+                if name not in self._futures:
+                    self._futures[name] = _get_pool().submit(_warm, name)
+
+    def cancel(self):
+        self.update("")
+
+    def status(self) -> dict:
+        with self._lock:
+            done = sum(future.done() for future in self._futures.values())
+            return {"names": len(self._futures), "done": done}
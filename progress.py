@@ -0,0 +1,57 @@
+import contextvars
+import time
+from contextlib import contextmanager
+import governor
+
+# Stage display names, in pipeline order
+STAGES = {
+    "research": "🔍 Researching participants",
+    "industry_analysis": "📊 Analyzing industry trends",
+    "meeting_strategy": "💡 Developing meeting strategy",
+    "summary_and_briefing": "📋 Compiling final brief",
+}
+
+_sink = contextvars.ContextVar("progress_sink", default=None)
+_stage = contextvars.ContextVar("progress_stage", default=None)
+
+
+def emit(event_type: str, **fields):
+    """Send a progress event to the run active in this context, if anyone is listening."""
+    sink = _sink.get()
+    if sink is None:
+        return
+    event = {"type": event_type, "stage": fields.pop("stage", _stage.get()), "ts": time.time()}
+    event.update(fields)
+    sink(event)
+
+
+@contextmanager
+def listen(on_event):
+    """Route events emitted inside the block (and contexts copied from it) to on_event."""
+    token = _sink.set(on_event)
+    try:
+        yield
+    finally:
+        _sink.reset(token)
+
+
+def set_stage(stage: str):
+    _stage.set(stage)
+
+
+def current_stage():
+    return _stage.get()
+
+
+def step_callback(step_output):
+    """crewai agent step callback: report each tool call the agent makes."""
+    if not isinstance(step_output, list):
+        return
+    for step in step_output:
+        if isinstance(step, tuple) and len(step) == 2:
+            action, observation = step
+            emit("tool_call", tool=getattr(action, "tool", ""), tool_input=str(getattr(action, "tool_input", ""))[:200])
+            run = governor.current()
+            if run is not None:
+                # Raises once the task is over budget, which stops the agent loop
+                run.record_tool_call(getattr(action, "tool", ""), str(observation))
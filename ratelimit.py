@@ -0,0 +1,251 @@
+import functools
+import os
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+import governor
+from metrics import RATE_LIMIT_CONCURRENCY, RATE_LIMIT_RETRIES, RATE_LIMIT_THROTTLED, RATE_LIMIT_WAIT
+
+# Requests per second, burst size and maximum in-flight calls per provider;
+# override with RATE_LIMIT_<PROVIDER>_RPS / _BURST / _CONCURRENCY
+DEFAULT_LIMITS = {
+    "serper": {"rps": 5.0, "burst": 5, "concurrency": 8},
+    "exa": {"rps": 5.0, "burst": 5, "concurrency": 4},
+    "gemini": {"rps": 4.0, "burst": 4, "concurrency": 8},
+}
+DEFAULT_LIMIT = {"rps": 5.0, "burst": 5, "concurrency": 4}
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "4"))
+RATE_LIMIT_BASE_DELAY = float(os.getenv("RATE_LIMIT_BASE_DELAY", "0.5"))
+RATE_LIMIT_MAX_DELAY = float(os.getenv("RATE_LIMIT_MAX_DELAY", "30"))
+# How often a caller waiting out a backoff re-checks its own run's budget
+WAIT_POLL_INTERVAL = 0.5
+
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+STATUS_RE = re.compile(r"status code (\d{3})")
+
+
+def _status(exc: Exception):
+    """HTTP status behind an exception from requests, google-api-core or exa_py, if any."""
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is None and isinstance(getattr(exc, "code", None), int):
+        status = exc.code
+    if status is None:
+        match = STATUS_RE.search(str(exc))
+        status = int(match.group(1)) if match else None
+    return status
+
+
+def _retry_after(exc: Exception):
+    """Seconds the provider asked us to wait, from a Retry-After header."""
+    response = getattr(exc, "response", None)
+    value = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+def _wait(delay: float):
+    """Sleep for a retry backoff, stopping early if the active run is cancelled or out of budget."""
+    until = time.monotonic() + delay
+    while True:
+        governor.check()
+        remaining = until - time.monotonic()
+        if remaining <= 0:
+            return
+        time.sleep(min(remaining, WAIT_POLL_INTERVAL))
+
+
+def _retryable(exc: Exception, status) -> bool:
+    if status is not None:
+        return status in RETRYABLE_STATUSES
+    # Connection resets and timeouts (requests' exceptions are OSErrors too)
+    return isinstance(exc, (OSError, TimeoutError))
+
+
+class RateLimiter:
+    """Token bucket plus AIMD concurrency limit for one provider.
+
+    Each call takes a token (refilled at `rps`, up to `burst`) and an in-flight
+    slot. Throttled responses halve the concurrency limit and, when the provider
+    sends Retry-After, pause every caller until then; successes grow the limit
+    back by roughly one slot per window of successful calls.
+    """
+
+    def __init__(self, name: str, rps: float, burst: int, concurrency: int, min_concurrency: int = 1,
+                 max_retries: int = RATE_LIMIT_MAX_RETRIES):
+        self.name = name
+        self.rps = rps
+        self.burst = max(1, burst)
+        self.max_concurrency = max(1, concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.max_retries = max_retries
+        self._cond = threading.Condition()
+        self._tokens = float(self.burst)
+        self._refilled = time.monotonic()
+        self._limit = float(self.max_concurrency)
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._stats = {"calls": 0, "throttled": 0, "retries": 0, "failures": 0}
+        RATE_LIMIT_CONCURRENCY.set(self._limit, provider=name)
+
+    def _refill(self, now: float):
+        if self.rps > 0:
+            self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rps)
+        else:
+            self._tokens = float(self.burst)
+        self._refilled = now
+
+    def _acquire(self):
+        started = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self._in_flight >= int(self._limit):
+                    # Woken by _release
+                    self._cond.wait()
+                    continue
+                if now < self._paused_until:
+                    self._cond.wait(self._paused_until - now)
+                    continue
+                if self._tokens < 1:
+                    self._cond.wait((1 - self._tokens) / self.rps)
+                    continue
+                self._tokens -= 1
+                self._in_flight += 1
+                self._stats["calls"] += 1
+                break
+        RATE_LIMIT_WAIT.observe(time.monotonic() - started, provider=self.name)
+
+    def _release(self, throttled: bool = False, pause: float = None):
+        with self._cond:
+            self._in_flight -= 1
+            if throttled:
+                self._limit = max(self.min_concurrency, self._limit / 2)
+                if pause:
+                    self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            else:
+                self._limit = min(self.max_concurrency, self._limit + 1 / self._limit)
+            RATE_LIMIT_CONCURRENCY.set(round(self._limit, 2), provider=self.name)
+            self._cond.notify_all()
+
+    def _backoff(self, attempt: int, retry_after) -> float:
+        # Full jitter keeps retrying callers from synchronising into new bursts
+        delay = random.uniform(0, min(RATE_LIMIT_MAX_DELAY, RATE_LIMIT_BASE_DELAY * 2 ** attempt))
+        if retry_after is not None:
+            delay = retry_after + random.uniform(0, RATE_LIMIT_BASE_DELAY)
+        return delay
+
+    def _failed(self, exc: Exception, attempt: int, retryable: bool = True):
+        """Release a failed call's slot and record it; returns the delay before retrying, or None to give up."""
+        status = _status(exc)
+        retry_after = _retry_after(exc)
+        throttled = status == 429
+        self._release(throttled=throttled, pause=retry_after)
+        if throttled:
+            RATE_LIMIT_THROTTLED.inc(provider=self.name)
+        retry = retryable and attempt < self.max_retries and _retryable(exc, status)
+        with self._cond:
+            self._stats["throttled"] += throttled
+            self._stats["retries" if retry else "failures"] += 1
+        if not retry:
+            return None
+        RATE_LIMIT_RETRIES.inc(provider=self.name)
+        return self._backoff(attempt, retry_after)
+
+    def call(self, func, *args, **kwargs):
+        """Run func under the limiter, retrying throttled and transient failures."""
+        for attempt in range(self.max_retries + 1):
+            # Stop spending quota once the run is cancelled or out of budget
+            governor.check()
+            self._acquire()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as exc:
+                delay = self._failed(exc, attempt)
+                if delay is None:
+                    raise
+                _wait(delay)
+                continue
+            self._release()
+            return result
+
+    def stream(self, func, *args, **kwargs):
+        """Like `call` for a func that returns an iterator; the slot is held until it is exhausted.
+
+        A failure before the first item is retried. Once items have been yielded a
+        failure is still counted against the limit but raised, since the caller has
+        already consumed part of the response.
+        """
+        for attempt in range(self.max_retries + 1):
+            governor.check()
+            self._acquire()
+            yielded = False
+            try:
+                for item in func(*args, **kwargs):
+                    yielded = True
+                    yield item
+            except GeneratorExit:
+                # The caller stopped reading; the call neither failed nor was throttled
+                self._release()
+                raise
+            except Exception as exc:
+                delay = self._failed(exc, attempt, retryable=not yielded)
+                if delay is None:
+                    raise
+                _wait(delay)
+                continue
+            self._release()
+            return
+
+    def stats(self) -> dict:
+        with self._cond:
+            return dict(self._stats, concurrency_limit=round(self._limit, 2), in_flight=self._in_flight)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def _setting(provider: str, name: str, default):
+    value = os.getenv(f"RATE_LIMIT_{provider.upper()}_{name.upper()}")
+    return type(default)(value) if value else default
+
+
+def limiter(provider: str) -> RateLimiter:
+    """The process-wide limiter for provider, shared by every run and thread."""
+    with _limiters_lock:
+        if provider not in _limiters:
+            defaults = DEFAULT_LIMITS.get(provider, DEFAULT_LIMIT)
+            _limiters[provider] = RateLimiter(
+                provider,
+                rps=_setting(provider, "rps", defaults["rps"]),
+                burst=_setting(provider, "burst", defaults["burst"]),
+                concurrency=_setting(provider, "concurrency", defaults["concurrency"]),
+            )
+        return _limiters[provider]
+
+
+def rate_limited(provider: str):
+    """Route every call of the decorated function through the provider's limiter."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return limiter(provider).call(func, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_rate_limit_stats() -> dict:
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {name: l.stats() for name, l in limiters.items()}
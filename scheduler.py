@@ -0,0 +1,90 @@
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def build_dag(tasks):
+    """Map every task to the tasks it depends on, taken from its `.context` list."""
+    known = set(tasks)
+    dag = {}
+    for task in tasks:
+        deps = list(task.context or [])
+        missing = [dep for dep in deps if dep not in known]
+        if missing:
+            raise ValueError(f"Task depends on {len(missing)} task(s) that are not part of the run")
+        dag[task] = deps
+
+    # Reject cycles up front instead of deadlocking later
+    visiting, done = set(), set()
+
+    def visit(task):
+        if task in done:
+            return
+        if task in visiting:
+            raise ValueError("Task dependencies contain a cycle")
+        visiting.add(task)
+        for dep in dag[task]:
+            visit(dep)
+        visiting.discard(task)
+        done.add(task)
+
+    for task in tasks:
+        visit(task)
+    return dag
+
+
+def run_tasks(tasks, max_workers: int = None, on_task_start=None, on_task_done=None, context_builder=None,
+              runners=None) -> str:
+    """Execute tasks concurrently, starting each one as soon as its dependencies finish.
+
+    `on_task_start` runs in the worker thread, inside a copy of the caller's context, so
+    context variables set by the caller (and by the hook) are visible to the task.
+    `context_builder(task, deps)` replaces crewai's raw join of upstream outputs.
+    `runners` maps a task to `runner(task, execute)` called instead of executing it
+    directly; `execute(task)` runs the normal path, so a runner can wrap or skip it.
+    A runner that skips it must set `task.output` so downstream tasks can read it.
+    Returns the output of the last task in `tasks`, mirroring `Crew.kickoff()`.
+    """
+    dag = build_dag(tasks)
+    pending = {task: set(deps) for task, deps in dag.items()}
+    outputs = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(tasks), thread_name_prefix="task") as pool:
+        running = {}
+
+        def execute_default(task):
+            if not (context_builder and dag[task]):
+                return task.execute()
+            context = context_builder(task, dag[task])
+            # Task.execute() ignores the context argument while .context is set
+            task.context = None
+            try:
+                return task.execute(context=context)
+            finally:
+                task.context = dag[task]
+
+        def execute(task):
+            if on_task_start:
+                on_task_start(task)
+            if runners and task in runners:
+                return runners[task](task, execute_default)
+            return execute_default(task)
+
+        def submit_ready():
+            for task in [t for t, deps in pending.items() if not deps]:
+                del pending[task]
+                ctx = contextvars.copy_context()
+                running[pool.submit(ctx.run, execute, task)] = task
+
+        submit_ready()
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                task = running.pop(future)
+                outputs[task] = future.result()  # re-raises the task's exception
+                if on_task_done:
+                    on_task_done(task, outputs[task])
+                for deps in pending.values():
+                    deps.discard(task)
+            submit_ready()
+
+    return outputs[tasks[-1]]
@@ -0,0 +1,227 @@
+import json
+import re
+from textwrap import dedent
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field, RootModel, ValidationError
+from metrics import SCHEMA_VALIDATIONS
+
+FENCE_RE = re.compile(r"```[a-zA-Z]*\s*(.*?)(?:```|$)", re.S)
+
+
+class _Output(BaseModel):
+    # Models add keys we didn't ask for; keep what we need, drop the rest
+    model_config = ConfigDict(extra="ignore")
+
+    def to_json(self) -> str:
+        return json.dumps(self.model_dump(mode="json", exclude_none=True), ensure_ascii=False)
+
+    def to_markdown(self) -> str:
+        parts = []
+        for name, field in type(self).model_fields.items():
+            value = getattr(self, name)
+            if not value:
+                continue
+            parts.append(f"### {field.title or name.replace('_', ' ').title()}")
+            if isinstance(value, list):
+                parts.append("\n".join(_bio(item) if isinstance(item, Participant) else f"- {item}" for item in value))
+            else:
+                parts.append(str(value))
+        return "\n\n".join(parts)
+
+    def to_context(self) -> str:
+        """How downstream tasks see this output; markdown is denser than JSON for prose."""
+        return self.to_markdown()
+
+
+class Participant(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    name: str
+    linkedin_url: Optional[str] = None
+    snippets: List[str] = Field(default_factory=list)
+    error: Optional[str] = None
+
+
+def _bio(participant: Participant) -> str:
+    line = f"- **{participant.name}**"
+    if participant.linkedin_url:
+        line += f" — [LinkedIn]({participant.linkedin_url})"
+    details = participant.snippets or ([participant.error] if participant.error else [])
+    return "\n".join([line] + [f"  - {detail}" for detail in details])
+
+
+class ResearchOutput(RootModel[List[Participant]]):
+    def to_json(self) -> str:
+        return json.dumps(self.model_dump(mode="json", exclude_none=True), ensure_ascii=False)
+
+    def to_markdown(self) -> str:
+        return "\n".join(_bio(participant) for participant in self.root)
+
+    def to_context(self) -> str:
+        # The compactor dedupes snippets structurally when it gets the records as JSON
+        return self.to_json()
+
+
+class IndustryAnalysis(_Output):
+    summary: str = Field(title="Industry Overview")
+    trends: List[str]
+    challenges: List[str]
+    opportunities: List[str]
+
+
+class MeetingStrategy(_Output):
+    talking_points: List[str]
+    questions: List[str] = Field(title="Strategic Questions")
+    angles: List[str] = Field(title="Discussion Angles")
+
+
+class MeetingBrief(_Output):
+    participant_bios: List[Participant]
+    industry_overview: str
+    talking_points: List[str]
+    recommendations: List[str] = Field(title="Strategic Recommendations")
+
+
+SCHEMAS = {
+    "research": ResearchOutput,
+    "industry_analysis": IndustryAnalysis,
+    "meeting_strategy": MeetingStrategy,
+    "summary_and_briefing": MeetingBrief,
+}
+
+EXAMPLES = {
+    "research": [
+        {"name": "Participant Name", "linkedin_url": "<URL or null>", "snippets": ["Snippet 1", "Snippet 2"]},
+    ],
+    "industry_analysis": {
+        "summary": "Two or three sentences on the state of the industry",
+        "trends": ["Trend and why it matters for this meeting"],
+        "challenges": ["Challenge"],
+        "opportunities": ["Opportunity"],
+    },
+    "meeting_strategy": {
+        "talking_points": ["Talking point"],
+        "questions": ["Strategic question to ask"],
+        "angles": ["Proposed angle to move toward the objective"],
+    },
+    "summary_and_briefing": {
+        "participant_bios": [{"name": "Participant Name", "linkedin_url": "<URL or null>", "snippets": ["Snippet"]}],
+        "industry_overview": "Short industry overview",
+        "talking_points": ["Talking point"],
+        "recommendations": ["Strategic recommendation"],
+    },
+}
+
+
+def expected_output(stage: str, description: str = "") -> str:
+    """The task's expected_output: what to produce, plus the exact JSON shape we validate against."""
+    example = json.dumps(EXAMPLES[stage], indent=2, ensure_ascii=False)
+    lead = dedent(description).strip()
+    lead = f"{lead}\n\n" if lead else ""
+    return f"{lead}Respond with only this JSON, no prose or code fences:\n{example}"
+
+
+def _balance(text: str) -> list:
+    """Close a JSON value that was cut off or has trailing commas; returns candidates, best first.
+
+    Scans outside strings only, dropping commas before a closer and stopping at the
+    end of the first complete value so trailing prose is ignored. If the text is
+    truncated, the open string and brackets are closed, and as a fallback the value
+    is also cut back to each earlier element boundary.
+    """
+    out, stack, cuts = [], [], []
+    in_string = escaped = False
+    for ch in text:
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch in "}]":
+            if not stack:
+                break
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            out.append(stack.pop())
+            if not stack:
+                return ["".join(out)]
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch == ",":
+            cuts.append((len(out), tuple(stack)))
+        out.append(ch)
+
+    candidates = []
+    if stack:
+        head = "".join(out) + ('"' if in_string else "")
+        candidates.append(head.rstrip().rstrip(",") + "".join(reversed(stack)))
+    for length, open_brackets in reversed(cuts):
+        candidates.append("".join(out[:length]) + "".join(reversed(open_brackets)))
+    return candidates
+
+
+def parse_json(text: str):
+    """Parse model output as JSON, repairing common defects locally instead of re-prompting.
+
+    Handles code fences, prose around the value, trailing commas and truncated
+    output. Returns (data, repaired); raises ValueError if nothing parses.
+    """
+    stripped = text.strip()
+    try:
+        return json.loads(stripped), False
+    except ValueError:
+        pass
+    fenced = FENCE_RE.search(stripped)
+    if fenced:
+        stripped = fenced.group(1)
+    starts = [i for i in (stripped.find("{"), stripped.find("[")) if i >= 0]
+    if not starts:
+        raise ValueError("no JSON value found")
+    for candidate in _balance(stripped[min(starts):]):
+        try:
+            return json.loads(candidate), True
+        except ValueError:
+            continue
+    raise ValueError("could not repair JSON")
+
+
+def _load(schema, text: str):
+    data, repaired = parse_json(text)
+    # Research is sometimes wrapped as {"participants": [...]}
+    if schema is ResearchOutput and isinstance(data, dict) and len(data) == 1:
+        data = next(iter(data.values()))
+    return schema.model_validate(data), repaired
+
+
+def validate(stage: str, text: str):
+    """Parse and validate one task's output against its schema; None if it doesn't conform."""
+    schema = SCHEMAS.get(stage)
+    if schema is None or not text:
+        return None
+    try:
+        result, repaired = _load(schema, text)
+    except (ValueError, ValidationError):
+        SCHEMA_VALIDATIONS.inc(stage=stage, outcome="invalid")
+        return None
+    SCHEMA_VALIDATIONS.inc(stage=stage, outcome="repaired" if repaired else "valid")
+    return result
+
+
+def render_markdown(stage: str, text: str):
+    """Markdown for a stored task output, or None if it isn't valid structured output."""
+    schema = SCHEMAS.get(stage)
+    if schema is None or not text:
+        return None
+    try:
+        return _load(schema, text)[0].to_markdown()
+    except (ValueError, ValidationError):
+        return None
@@ -0,0 +1,96 @@
+import copy
+import functools
+import threading
+from cache import normalize_key
+import governor
+from metrics import COALESCED_CALLS
+
+# How often a waiting caller re-checks its own run's budget
+WAIT_POLL_INTERVAL = 0.5
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class Group:
+    """Process-wide single flight: concurrent callers with the same key share one call.
+
+    The first caller (the leader) runs the function; callers arriving while it is
+    in flight wait for its result and get their own deep copy of it. If the
+    leader was stopped by its own run's governor, waiters retry rather than
+    inheriting someone else's cancellation.
+    """
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {"leaders": 0, "followers": 0}
+
+    def do(self, key: str, func, *args, **kwargs):
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+                self._stats["leaders" if leader else "followers"] += 1
+            COALESCED_CALLS.inc(namespace=self.namespace, role="leader" if leader else "follower")
+
+            if leader:
+                try:
+                    call.value = func(*args, **kwargs)
+                    return call.value
+                except Exception as e:
+                    call.error = e
+                    raise
+                finally:
+                    with self._lock:
+                        del self._calls[key]
+                    call.done.set()
+
+            while not call.done.wait(WAIT_POLL_INTERVAL):
+                governor.check()
+            if isinstance(call.error, governor.BudgetExceeded):
+                continue
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.value)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats, in_flight=len(self._calls))
+        total = stats["leaders"] + stats["followers"]
+        stats["coalescing_ratio"] = round(stats["followers"] / total, 3) if total else 0.0
+        return stats
+
+
+_groups = {}
+_groups_lock = threading.Lock()
+
+
+def group(namespace: str) -> Group:
+    with _groups_lock:
+        if namespace not in _groups:
+            _groups[namespace] = Group(namespace)
+        return _groups[namespace]
+
+
+def coalesced(namespace: str, lower: bool = True):
+    """Share one in-flight call among concurrent callers with the same normalized arguments."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args):
+            return group(namespace).do(normalize_key(*args, lower=lower), func, *args)
+        return wrapper
+    return decorator
+
+
+def get_coalescing_stats() -> dict:
+    with _groups_lock:
+        groups = dict(_groups)
+    return {name: g.stats() for name, g in groups.items()}
@@ -1,15 +1,31 @@
 import streamlit as st
 import asyncio
 import json
+import sys
+import time
 from datetime import datetime
 from dotenv import load_dotenv
-from crewai import Crew
-from agents import MeetingPreparationAgents
-from tasks import MeetingPreparationTasks
+from progress import STAGES
+from metrics import start_metrics_server
+from jobs import CANCELLED, FAILED, SUCCEEDED, QueueFullError, get_job_queue
+from cache import get_cache
+from ratelimit import get_rate_limit_stats
+from singleflight import get_coalescing_stats
+from archive import get_archive
+from industry import get_industry_store
+from prefetch import SPECULATIVE_PREFETCH, ParticipantPrefetcher
 
 # Load environment variables
 load_dotenv()
 
+# Expose Prometheus metrics on METRICS_PORT (once per process)
+start_metrics_server()
+
+# Seconds between result polls while a brief is being generated
+JOB_POLL_INTERVAL = 1.0
+# Archived briefs listed per history page
+HISTORY_PAGE_SIZE = 20
+
 # Page config
 st.set_page_config(
     page_title="Meeting Prep Assistant",
@@ -88,55 +104,131 @@ def initialize_session_state():
         st.session_state.crew_result = None
     if 'processing' not in st.session_state:
         st.session_state.processing = False
+    if 'stage_outputs' not in st.session_state:
+        st.session_state.stage_outputs = {}
+    if 'recalled_from' not in st.session_state:
+        st.session_state.recalled_from = None
+    if 'history_page' not in st.session_state:
+        st.session_state.history_page = 0
+    if 'job_id' not in st.session_state:
+        st.session_state.job_id = None
+        # Reattach to a running or finished job after a browser refresh
+        job_id = st.query_params.get("job")
+        job = get_job_queue().get(job_id) if job_id else None
+        if job is not None:
+            st.session_state.job_id = job_id
+            st.session_state.processing = True
+            st.session_state.meeting_data = {
+                'participants': job['participants'],
+                'context': job['context'],
+                'objective': job['objective'],
+                'timestamp': datetime.fromtimestamp(job['created_at']).strftime("%Y-%m-%d %H:%M:%S")
+            }
 
-def run_meeting_prep_crew(participants, context, objective):
-    """Run the meeting preparation crew"""
-    try:
-        # Initialize tasks and agents
-        tasks = MeetingPreparationTasks()
-        agents = MeetingPreparationAgents()
+def cache_stats():
+    """Cache, rate-limit, coalescing and shared-analysis statistics, without forcing the LLM stack to load before the first brief"""
+    llm = sys.modules.get("llm")
+    return {"llm": llm.get_llm_cache_stats() if llm else "not loaded yet", "search": get_cache().stats(),
+            "rate_limits": get_rate_limit_stats(), "coalescing": get_coalescing_stats(),
+            "industry_analyses": get_industry_store().stats()}
 
-        # Create Agents
-        researcher_agent = agents.research_agent()
-        industry_analyst_agent = agents.industry_analysis_agent()
-        meeting_strategy_agent = agents.meeting_strategy_agent()
-        summary_and_briefing_agent = agents.summary_and_briefing_agent()
+def structured_markdown(stage, output):
+    """Render a schema-valid stage output as markdown; None for free text or partial output"""
+    # Imported here so pydantic only loads once there is an output to show
+    from schemas import render_markdown
+    return render_markdown(stage, output) if isinstance(output, str) else None
 
-        # Create Tasks
-        research = tasks.research_task(researcher_agent, participants, context)
-        industry_analysis = tasks.industry_analysis_task(industry_analyst_agent, participants, context)
-        meeting_strategy = tasks.meeting_strategy_task(meeting_strategy_agent, context, objective)
-        summary_and_briefing = tasks.summary_and_briefing_task(summary_and_briefing_agent, context, objective)
+def render_stage_output(stage, output, reused=False):
+    """Show one finished stage's output in a collapsible section"""
+    label = f"♻️ {STAGES.get(stage, stage)} (reused from a previous run)" if reused else f"✅ {STAGES.get(stage, stage)}"
+    with st.expander(label, expanded=False):
+        st.markdown(structured_markdown(stage, output) or output)
 
-        # Set dependencies
-        meeting_strategy.context = [research, industry_analysis]
-        summary_and_briefing.context = [research, industry_analysis, meeting_strategy]
+def cancel_current_job():
+    """Stop this session's in-flight brief so its worker and API quota are freed"""
+    if st.session_state.get('processing') and st.session_state.get('job_id'):
+        get_job_queue().cancel(st.session_state.job_id)
 
-        # Create and run Crew
-        crew = Crew(
-            agents=[researcher_agent, industry_analyst_agent, meeting_strategy_agent, summary_and_briefing_agent],
-            tasks=[research, industry_analysis, meeting_strategy, summary_and_briefing]
-        )
+def participants_input(**kwargs):
+    return st.text_area(
+        "👥 Meeting Participants",
+        placeholder="Enter the names of participants (other than you), separated by commas...",
+        help="List all participants who will be in the meeting",
+        key="participants_input",
+        **kwargs
+    )
 
-        return crew.kickoff()
-    
-    except Exception as e:
-        return f"Error running crew: {str(e)}"
+def prefetch_participants():
+    """Start (or re-target) background lookups for the names currently in the participants field"""
+    if 'prefetcher' not in st.session_state:
+        st.session_state.prefetcher = ParticipantPrefetcher()
+    st.session_state.prefetcher.update(st.session_state.participants_input)
+
+def open_archived_brief(brief_id):
+    """Load one archived brief into the session as the current result"""
+    record = get_archive().get(brief_id)
+    if record is None:
+        st.error("❌ That brief is no longer in the archive.")
+        return
+    st.session_state.meeting_data = {
+        'participants': record['participants'],
+        'context': record['context'],
+        'objective': record['objective'],
+        'timestamp': datetime.fromtimestamp(record['created_at']).strftime("%Y-%m-%d %H:%M:%S")
+    }
+    st.session_state.crew_result = record['brief']
+    st.session_state.stage_outputs = record['stage_outputs']
+    st.session_state.reused_stages = []
+    st.session_state.degraded_stages = []
+    st.session_state.recalled_from = record['created_at']
+    st.session_state.processing = False
+    st.session_state.job_id = None
+    st.query_params.clear()
+    st.rerun()
+
+def render_history():
+    """Page through archived briefs; only the visible page's index rows are read"""
+    st.markdown('<div class="section-header">📚 Brief History</div>', unsafe_allow_html=True)
+    if not st.toggle("Show past briefs", key="show_history"):
+        return
+
+    archive = get_archive()
+    query = st.text_input("🔎 Filter by participant, context or objective", key="history_query")
+    if query != st.session_state.get('history_last_query'):
+        st.session_state.history_last_query = query
+        st.session_state.history_page = 0
+    total = archive.count(query)
+    pages = max(1, -(-total // HISTORY_PAGE_SIZE))
+    page = min(st.session_state.history_page, pages - 1)
+
+    for row in archive.page(offset=page * HISTORY_PAGE_SIZE, limit=HISTORY_PAGE_SIZE, query=query):
+        created = datetime.fromtimestamp(row['created_at']).strftime("%Y-%m-%d %H:%M")
+        info, action = st.columns([5, 1])
+        info.markdown(f"**{created}** · {row['participants']} — {row['objective'][:100]}")
+        if action.button("Open", key=f"open_brief_{row['id']}"):
+            open_archived_brief(row['id'])
+
+    prev_col, label_col, next_col = st.columns([1, 2, 1])
+    if prev_col.button("⬅️ Newer", disabled=page == 0):
+        st.session_state.history_page = page - 1
+        st.rerun()
+    label_col.caption(f"Page {page + 1} of {pages} · {total} briefs")
+    if next_col.button("Older ➡️", disabled=page >= pages - 1):
+        st.session_state.history_page = page + 1
+        st.rerun()
 
 def display_meeting_brief(result):
     """Display the meeting brief in a structured format"""
     st.markdown('<div class="section-header">📋 Meeting Brief</div>', unsafe_allow_html=True)
     
-    # Try to parse JSON if result is structured
-    try:
-        if isinstance(result, str):
-            # If it's a string, display it directly
-            st.markdown(f'<div class="success-box">{result}</div>', unsafe_allow_html=True)
-        else:
-            # If it's structured data, format it nicely
-            st.json(result)
-    except:
-        st.markdown(f'<div class="success-box">{str(result)}</div>', unsafe_allow_html=True)
+    # Validated briefs are canonical JSON; render their sections instead of the raw string
+    brief = structured_markdown("summary_and_briefing", result)
+    if brief:
+        st.markdown(brief)
+    elif isinstance(result, str):
+        st.markdown(f'<div class="success-box">{result}</div>', unsafe_allow_html=True)
+    else:
+        st.json(result)
 
 def main():
     # Initialize session state
@@ -162,9 +254,21 @@ def main():
         - EXA_API_KEY
         """)
         
+        with st.expander("📈 Cache Stats"):
+            st.json(cache_stats())
+
+        speculative = st.toggle("⚡ Speculative prefetch", value=SPECULATIVE_PREFETCH, key="speculative_prefetch",
+                                help="Look up participants as soon as their names are entered, before the form is submitted")
+        if not speculative and 'prefetcher' in st.session_state:
+            st.session_state.prefetcher.cancel()
+
         if st.button("🗑️ Clear Session"):
+            cancel_current_job()
+            if 'prefetcher' in st.session_state:
+                st.session_state.prefetcher.cancel()
             for key in list(st.session_state.keys()):
                 del st.session_state[key]
+            st.query_params.clear()
             st.rerun()
     
     # Main content area
@@ -173,13 +277,18 @@ def main():
     with col1:
         st.markdown('<div class="section-header">📝 Meeting Details</div>', unsafe_allow_html=True)
         
+        if speculative:
+            # Outside the form so lookups can start as soon as the names are entered
+            participants = participants_input(on_change=prefetch_participants)
+            if 'prefetcher' in st.session_state:
+                status = st.session_state.prefetcher.status()
+                if status["names"]:
+                    st.caption(f"⚡ Prefetched {status['done']}/{status['names']} participants")
+
         # Input form
         with st.form("meeting_form"):
-            participants = st.text_area(
-                "👥 Meeting Participants",
-                placeholder="Enter the names of participants (other than you), separated by commas...",
-                help="List all participants who will be in the meeting"
-            )
+            if not speculative:
+                participants = participants_input()
             
             context = st.text_area(
                 "🎯 Meeting Context",
@@ -193,6 +302,11 @@ def main():
                 help="What are your specific goals for this meeting?"
             )
             
+            fresh = st.checkbox(
+                "🔄 Regenerate",
+                help="Run the research again instead of reusing a recent brief for exactly these inputs"
+            )
+            
             submitted = st.form_submit_button("🚀 Generate Meeting Brief")
             
             if submitted:
@@ -200,14 +314,26 @@ def main():
                     st.error("⚠️ Please fill in all fields before generating the meeting brief.")
                 else:
                     # Store form data
-                    st.session_state.meeting_data = {
-                        'participants': participants,
-                        'context': context,
-                        'objective': objective,
-                        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    }
-                    st.session_state.processing = True
-                    st.rerun()
+                    try:
+                        # A new request supersedes the one still running for this session
+                        cancel_current_job()
+                        job_id = get_job_queue().submit(participants, context, objective, fresh=fresh)
+                    except QueueFullError as e:
+                        st.error(f"⏳ The server is busy: {str(e)}")
+                    else:
+                        st.session_state.meeting_data = {
+                            'participants': participants,
+                            'context': context,
+                            'objective': objective,
+                            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                        }
+                        st.session_state.job_id = job_id
+                        st.session_state.crew_result = None
+                        st.session_state.recalled_from = None
+                        st.session_state.stage_outputs = {}
+                        st.query_params["job"] = job_id
+                        st.session_state.processing = True
+                        st.rerun()
     
     with col2:
         st.markdown('<div class="section-header">ℹ️ How it Works</div>', unsafe_allow_html=True)
@@ -237,47 +363,55 @@ def main():
     if st.session_state.processing and st.session_state.meeting_data:
         st.markdown('<div class="section-header">🔄 Processing Meeting Brief</div>', unsafe_allow_html=True)
         
-        progress_placeholder = st.empty()
-        status_placeholder = st.empty()
-        
-        with progress_placeholder.container():
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            
-            # Simulate progress updates
-            statuses = [
-                "🔍 Researching participants...",
-                "📊 Analyzing industry trends...",
-                "💡 Developing meeting strategy...",
-                "📋 Compiling final brief..."
-            ]
-            
-            for i, status in enumerate(statuses):
-                status_text.text(status)
-                progress_bar.progress((i + 1) * 25)
-                
-                if i == len(statuses) - 1:  # Last step
-                    # Run the actual crew
-                    try:
-                        result = run_meeting_prep_crew(
-                            st.session_state.meeting_data['participants'],
-                            st.session_state.meeting_data['context'],
-                            st.session_state.meeting_data['objective']
-                        )
-                        st.session_state.crew_result = result
-                        st.session_state.processing = False
-                        progress_placeholder.empty()
-                        status_placeholder.empty()
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"❌ Error generating brief: {str(e)}")
-                        st.session_state.processing = False
-                        progress_placeholder.empty()
-                        status_placeholder.empty()
-                        break
-    
+        # The crew runs on the shared worker pool; poll the job instead of blocking this session
+        job = get_job_queue().get(st.session_state.job_id)
+        if job is None:
+            st.error("❌ This brief is no longer available. Please generate it again.")
+            st.session_state.processing = False
+        elif job["status"] == SUCCEEDED:
+            st.session_state.crew_result = job["result"]
+            st.session_state.stage_outputs = job["stage_outputs"]
+            st.session_state.reused_stages = job["reused_stages"]
+            st.session_state.degraded_stages = job["degraded_stages"]
+            st.session_state.recalled_from = job["recalled_from"]
+            st.session_state.processing = False
+            st.rerun()
+        elif job["status"] == CANCELLED:
+            st.warning(f"⏹️ {job['error']}")
+            st.session_state.stage_outputs = job["stage_outputs"]
+            st.session_state.processing = False
+        elif job["status"] == FAILED:
+            st.error(f"❌ Error generating brief: {job['error']}")
+            st.session_state.stage_outputs = job["stage_outputs"]
+            st.session_state.processing = False
+        else:
+            progress = job.get("progress") or {"stage_outputs": {}, "reused": [], "status_text": "⏳ Queued...", "streamed": ""}
+            st.progress(int(100 * len(progress["stage_outputs"]) / len(STAGES)))
+            st.text(progress["status_text"])
+            for stage, output in progress["stage_outputs"].items():
+                if stage != "summary_and_briefing":
+                    render_stage_output(stage, output, reused=stage in progress["reused"])
+            if progress["streamed"]:
+                st.markdown(progress["streamed"])
+            time.sleep(JOB_POLL_INTERVAL)
+            st.rerun()
+
     # Display results
     if st.session_state.crew_result and not st.session_state.processing:
+        reused = st.session_state.get('reused_stages', [])
+        if st.session_state.recalled_from:
+            recalled = datetime.fromtimestamp(st.session_state.recalled_from).strftime("%Y-%m-%d %H:%M")
+            st.caption(f"♻️ Recalled from the brief archive (generated {recalled})")
+            reused = []
+        elif reused:
+            st.caption("♻️ Reused unchanged stages: " + ", ".join(STAGES.get(stage, stage) for stage in reused))
+        degraded = st.session_state.get('degraded_stages', [])
+        if degraded:
+            st.warning("⚠️ Partial brief: " + ", ".join(STAGES.get(stage, stage) for stage in degraded)
+                       + " stopped early at a time or usage limit. It was not archived; generate it again for a complete brief.")
+        for stage, output in st.session_state.stage_outputs.items():
+            if stage != "summary_and_briefing":
+                render_stage_output(stage, output, reused=stage in reused)
         display_meeting_brief(st.session_state.crew_result)
         
         # Download button
@@ -306,5 +440,7 @@ BRIEF:
                     mime="text/plain"
                 )
 
+    render_history()
+
 if __name__ == "__main__":
     main()
@@ -1,16 +1,17 @@
 from textwrap import dedent
 from crewai import Task
+from schemas import expected_output
 
 class MeetingPreparationTasks():
     def research_task(self, agent, participants, context):
         return Task(
             description=dedent(f"""
-                Use the SerperSearch tool to find LinkedIn profiles for the following participants:
+                Use the SerperBatchSearch tool to find LinkedIn profiles for the following participants:
                 {participants}
 
-                For each participant:
-                - Search using: "LinkedIn <participant_name>"
-                - Ensure the query includes: `site:linkedin.com/in`
+                - Call SerperBatchSearch ONCE with the full comma-separated participant list;
+                  it looks everyone up in parallel and returns one record per participant.
+                - Only fall back to SerperSearch for an individual participant whose record has an error.
                 - Only return structured output from the search results. Do not summarize or infer content.
                 - Your job is to extract:
                   • Name
@@ -19,20 +20,9 @@ class MeetingPreparationTasks():
                 - Do NOT fabricate or guess URLs. Only return LinkedIn links that appear in search results.
                 Return the results exactly as found in the search JSON.
             """),
-            expected_output=dedent("""
-                Output JSON format:
-                [
-                  {
-                    "name": "Participant Name",
-                    "linkedin_url": "<URL or null>",
-                    "snippets": ["Snippet 1", "Snippet 2"]
-                  },
-                  ...
-                ]
-            """),
-            async_execution=False,  # Can be done in parallel
-            agent=agent,
-            output_json=True
+            expected_output=expected_output("research", "One record per participant, in input order."),
+            async_execution=False,  # Run in parallel by the scheduler (no dependencies)
+            agent=agent
         )
 
     def industry_analysis_task(self, agent, participants, context):
@@ -46,13 +36,31 @@ class MeetingPreparationTasks():
                 Participants: {participants}
                 Meeting Context: {context}
             """),
-            expected_output=dedent("""\
+            expected_output=expected_output("industry_analysis", """\
+                An insightful analysis that identifies major trends, potential
+                challenges, and strategic opportunities.
+            """),
+            async_execution=False,  # Run in parallel by the scheduler (no dependencies)
+            agent=agent
+        )
+
+    def shared_industry_analysis_task(self, agent, industry):
+        return Task(
+            description=dedent(f"""\
+                Analyze the current trends, challenges, and opportunities in the
+                {industry} industry. Consider market reports, recent developments,
+                and expert opinions to provide a comprehensive overview of the
+                industry landscape.
+
+                This analysis is shared by every meeting in this industry, so keep it
+                general: do not refer to any specific company, person, or meeting.
+            """),
+            expected_output=expected_output("industry_analysis", """\
                 An insightful analysis that identifies major trends, potential
                 challenges, and strategic opportunities.
             """),
-            async_execution=False,  # Can also run in parallel
-            agent=agent,
-            output_json=True
+            async_execution=False,  # Run in parallel by the scheduler (no dependencies)
+            agent=agent
         )
 
     def meeting_strategy_task(self, agent, context, objective):
@@ -64,13 +72,12 @@ class MeetingPreparationTasks():
                 Meeting Context: {context}
                 Meeting Objective: {objective}
             """),
-            expected_output=dedent("""\
+            expected_output=expected_output("meeting_strategy", """\
                 A complete report with key talking points, strategic questions,
                 and proposed angles to achieve the meeting's objective.
             """),
             async_execution=False,  # Depends on prior tasks
-            agent=agent,
-            output_json=True
+            agent=agent
         )
 
     def summary_and_briefing_task(self, agent, context, objective):
@@ -87,7 +94,7 @@ class MeetingPreparationTasks():
                 Meeting Context: {context}
                 Meeting Objective: {objective}
             """),
-            expected_output=dedent("""\
+            expected_output=expected_output("summary_and_briefing", """\
             A well-structured briefing document that includes:
             - Participant bios (based on retrieved LinkedIn URLs and snippets)
             - Industry overview
@@ -95,6 +102,5 @@ class MeetingPreparationTasks():
             - Strategic recommendations
             """),
             async_execution=False,  # Should run last
-            agent=agent,
-            output_json=True
+            agent=agent
         )
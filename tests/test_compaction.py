@@ -0,0 +1,41 @@
+import json
+from compaction import TRIM_MARKER, compact_context, estimate_tokens
+
+
+def test_duplicate_lines_and_urls_are_dropped():
+    line = "Acme raised a Series C led by Example Ventures in 2024."
+    sections = [
+        ("Industry", f"{line}\nSource: https://example.com/a"),
+        ("Strategy", f"{line}\n- https://example.com/a\nAsk about the new CFO's priorities for the year."),
+    ]
+    context, stats = compact_context(sections, budget_tokens=1000)
+    assert context.count(line) == 1
+    assert context.count("https://example.com/a") == 1
+    assert "new CFO" in context
+    assert stats["tokens_saved"] > 0
+
+
+def test_research_records_keep_names_and_drop_repeated_snippets():
+    records = [
+        {"name": "Ada", "linkedin_url": "https://linkedin.com/in/ada", "snippets": ["CTO at Acme", "CTO at Acme"]},
+        {"name": "Bob", "linkedin_url": None, "snippets": ["CTO at Acme", "VP Sales"]},
+    ]
+    context, _ = compact_context([("Research", json.dumps(records))], budget_tokens=1000)
+    compacted = json.loads(context.split("\n", 1)[1])
+    assert [r["name"] for r in compacted] == ["Ada", "Bob"]
+    assert compacted[0]["snippets"] == ["CTO at Acme"]
+    assert compacted[1]["snippets"] == ["VP Sales"]
+
+
+def test_free_text_is_trimmed_to_budget():
+    text = "\n".join(f"Paragraph {i} about the company's market position and outlook." for i in range(200))
+    context, stats = compact_context([("Industry", text)], budget_tokens=200)
+    assert context.endswith(TRIM_MARKER)
+    assert estimate_tokens(context) <= 200
+    assert stats["tokens_after"] < stats["tokens_before"]
+
+
+def test_sections_keep_dependency_order():
+    sections = [("Research", json.dumps([{"name": "Ada", "snippets": []}])), ("Industry", "Trends")]
+    context, _ = compact_context(sections, budget_tokens=1000)
+    assert context.index("## Research") < context.index("## Industry")
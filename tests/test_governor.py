@@ -0,0 +1,64 @@
+import pytest
+import governor
+from governor import BudgetExceeded, Governor, RunCancelled
+
+
+def test_check_passes_within_limits():
+    Governor(deadline=60, max_tokens=100).check()
+
+
+def test_cancel_raises_run_cancelled_with_reason():
+    run = Governor()
+    run.cancel("client disconnected")
+    with pytest.raises(RunCancelled, match="client disconnected"):
+        run.check()
+
+
+def test_abandoned_callback_cancels_the_run():
+    run = Governor(abandoned=lambda: True)
+    with pytest.raises(RunCancelled, match="abandoned"):
+        run.check()
+    assert run.cancelled
+
+
+def test_run_deadline():
+    run = Governor(deadline=1e-9)
+    with pytest.raises(BudgetExceeded, match="run deadline"):
+        run.check()
+
+
+def test_token_budget():
+    run = Governor(max_tokens=10)
+    run.add_tokens(10)
+    with pytest.raises(BudgetExceeded, match="token budget"):
+        run.check()
+
+
+def test_tool_call_cap_is_per_task():
+    run = Governor(max_tool_calls_per_task=2)
+    with run.task("research"):
+        run.record_tool_call("search", "first")
+        with pytest.raises(BudgetExceeded, match="research used its 2 tool calls"):
+            run.record_tool_call("search", "second")
+    with run.task("industry_analysis"):
+        run.check()
+
+
+def test_partial_output_uses_task_observations():
+    run = Governor(max_tool_calls_per_task=0)
+    with run.task("research"):
+        run.record_tool_call("search", "Ada is CTO")
+    partial = run.partial_output("research", "deadline reached", upstream=["unused"])
+    assert partial.startswith(governor.PARTIAL_MARKER.format(reason="deadline reached"))
+    assert "search: Ada is CTO" in partial
+    assert "unused" not in partial
+
+
+def test_module_check_uses_active_governor():
+    governor.check()
+    run = Governor()
+    run.cancel()
+    with governor.activate(run):
+        with pytest.raises(RunCancelled):
+            governor.check()
+    governor.check()
@@ -0,0 +1,50 @@
+import pytest
+from industry import industry_topic
+
+
+def _key(context):
+    topic = industry_topic(context)
+    return topic["key"] if topic else None
+
+
+@pytest.mark.parametrize("context", [
+    "new power user features of our dashboard",
+    "bank holiday schedule for the joint marketing launch",
+    "plant-based protein product line",
+    "Build a store of goodwill with the founders of an AI startup",
+    "Quarterly review of our analytics license and the patient onboarding flow",
+    "Catch-up on grid layout changes for the admin console",
+    "",
+    None,
+])
+def test_incidental_keywords_do_not_pick_an_industry(context):
+    assert industry_topic(context) is None
+
+
+def test_one_keyword_is_not_enough():
+    assert _key("Intro meeting about deploying our scheduling AI across a regional hospital network") is None
+
+
+def test_plural_forms_count_as_one_keyword():
+    assert _key("Payment terms for the payments team offsite") is None
+
+
+def test_phrase_counts_once():
+    # "embedded payments" must not also count as "payments"
+    assert _key("Pitch embedded payments to the events team") is None
+
+
+@pytest.mark.parametrize("context, key", [
+    ("Exploratory partnership discussion with Stripe about embedded payments for our B2B marketplace", "fintech"),
+    ("Rolling out our EHR integration across the hospital's clinical teams", "healthcare"),
+    ("Renewal of the CRM subscription for their SaaS sales team", "enterprise_software"),
+    ("Freight visibility for their trucking fleet", "logistics"),
+    ("Smart grid pilot with a regional utility company", "energy"),
+])
+def test_clear_industry_is_matched(context, key):
+    assert _key(context) == key
+
+
+def test_close_runner_up_is_ambiguous():
+    # Two fintech keywords against two healthcare ones
+    assert _key("Payments and lending for hospitals and clinical practices") is None
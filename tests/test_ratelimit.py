@@ -0,0 +1,141 @@
+import pytest
+import governor
+import ratelimit
+from ratelimit import RateLimiter
+
+
+class _Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status code {status_code}")
+        self.response = _Response(status_code, headers)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(ratelimit, "RATE_LIMIT_BASE_DELAY", 0.0)
+
+
+def _limiter(**kwargs):
+    # rps=0 disables the token bucket so only concurrency and retries are exercised
+    return RateLimiter("test", **dict({"rps": 0, "burst": 1, "concurrency": 8, "max_retries": 3}, **kwargs))
+
+
+def _flaky(*errors, result="ok"):
+    errors = list(errors)
+
+    def func():
+        if errors:
+            raise errors.pop(0)
+        return result
+    return func
+
+
+def test_retries_transient_failures():
+    limiter = _limiter()
+    assert limiter.call(_flaky(HTTPError(503), ConnectionResetError())) == "ok"
+    assert limiter.stats()["retries"] == 2
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_client_errors_are_not_retried():
+    limiter = _limiter()
+    with pytest.raises(HTTPError):
+        limiter.call(_flaky(HTTPError(400)))
+    assert limiter.stats()["retries"] == 0
+    assert limiter.stats()["failures"] == 1
+
+
+def test_gives_up_after_max_retries():
+    limiter = _limiter(max_retries=2)
+    with pytest.raises(HTTPError):
+        limiter.call(_flaky(*[HTTPError(503)] * 3))
+    assert limiter.stats()["retries"] == 2
+
+
+def test_throttling_halves_concurrency_and_successes_grow_it_back():
+    limiter = _limiter()
+    limiter.call(_flaky(HTTPError(429)))
+    # Halved to 4 by the 429, then one additive step for the success
+    assert limiter.stats()["concurrency_limit"] == 4.25
+    assert limiter.stats()["throttled"] == 1
+    for _ in range(100):
+        limiter.call(_flaky())
+    assert limiter.stats()["concurrency_limit"] == 8
+
+
+def test_concurrency_never_drops_below_minimum():
+    limiter = _limiter(concurrency=2, max_retries=5)
+    limiter.call(_flaky(*[HTTPError(429)] * 5))
+    assert limiter.stats()["concurrency_limit"] >= 1
+
+
+def test_retry_after_pauses_every_caller(monkeypatch):
+    waits = []
+    monkeypatch.setattr(ratelimit, "_wait", waits.append)
+    limiter = _limiter()
+    limiter.call(_flaky(HTTPError(429, {"Retry-After": "7"})))
+    assert 7 <= waits[0] < 7 + 0.5 + 1e-9
+    assert limiter._paused_until > 0
+
+
+def test_retry_after_parsing():
+    assert ratelimit._retry_after(HTTPError(429, {"Retry-After": "2.5"})) == 2.5
+    assert ratelimit._retry_after(HTTPError(429, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+    assert ratelimit._retry_after(HTTPError(429, {"Retry-After": "soon"})) is None
+    assert ratelimit._retry_after(HTTPError(429)) is None
+
+
+def test_status_from_message():
+    assert ratelimit._status(Exception("Request failed with status code 502")) == 502
+
+
+def test_cancelled_run_stops_waiting_for_a_retry():
+    run = governor.Governor()
+    limiter = _limiter()
+
+    def fail_and_cancel():
+        run.cancel("client disconnected")
+        raise HTTPError(429, {"Retry-After": "30"})
+
+    with governor.activate(run), pytest.raises(governor.RunCancelled):
+        limiter.call(fail_and_cancel)
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_stream_retries_before_first_item_and_holds_slot():
+    limiter = _limiter()
+    attempts = []
+
+    def items():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise HTTPError(429)
+        yield "a"
+        assert limiter.stats()["in_flight"] == 1
+        yield "b"
+
+    assert list(limiter.stream(items)) == ["a", "b"]
+    assert len(attempts) == 2
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_stream_failure_after_items_is_raised():
+    limiter = _limiter()
+
+    def items():
+        yield "a"
+        raise HTTPError(503)
+
+    received = []
+    with pytest.raises(HTTPError):
+        for item in limiter.stream(items):
+            received.append(item)
+    assert received == ["a"]
+    assert limiter.stats()["retries"] == 0
+    assert limiter.stats()["in_flight"] == 0
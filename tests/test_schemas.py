@@ -0,0 +1,60 @@
+import pytest
+from schemas import parse_json, validate
+
+
+def test_plain_json_is_not_repaired():
+    assert parse_json('{"a": [1, 2]}') == ({"a": [1, 2]}, False)
+
+
+def test_code_fence_and_surrounding_prose():
+    text = 'Here is the analysis:\n```json\n{"a": 1}\n```\nLet me know if you need more.'
+    assert parse_json(text) == ({"a": 1}, True)
+
+
+def test_unterminated_code_fence():
+    assert parse_json('```json\n{"a": 1}') == ({"a": 1}, True)
+
+
+def test_trailing_commas():
+    assert parse_json('{"a": [1, 2, ], "b": {"c": 3,},}') == ({"a": [1, 2], "b": {"c": 3}}, True)
+
+
+def test_trailing_prose_after_value():
+    assert parse_json('{"a": "x"} and some notes {not json}') == ({"a": "x"}, True)
+
+
+def test_brackets_and_commas_inside_strings_are_kept():
+    assert parse_json('{"a": "x, ]}", "b": "say \\"hi\\"",}') == ({"a": "x, ]}", "b": 'say "hi"'}, True)
+
+
+def test_truncated_array_is_closed():
+    assert parse_json('{"trends": ["one", "two"') == ({"trends": ["one", "two"]}, True)
+
+
+def test_truncated_string_is_closed():
+    assert parse_json('{"summary": "cut off mid-sent') == ({"summary": "cut off mid-sent"}, True)
+
+
+def test_truncated_key_falls_back_to_last_element_boundary():
+    assert parse_json('[{"name": "A"}, {"name": "B"}, {"na') == ([{"name": "A"}, {"name": "B"}], True)
+
+
+def test_no_json_raises():
+    with pytest.raises(ValueError):
+        parse_json("Sorry, I could not find anything.")
+
+
+def test_validate_repairs_truncated_output():
+    text = '```json\n{"summary": "s", "trends": ["t"], "challenges": [], "opportunities": ["o",'
+    result = validate("industry_analysis", text)
+    assert result is not None
+    assert result.opportunities == ["o"]
+
+
+def test_validate_unwraps_research_list():
+    result = validate("research", '{"participants": [{"name": "Ada", "snippets": ["x"]}]}')
+    assert [p.name for p in result.root] == ["Ada"]
+
+
+def test_validate_rejects_wrong_shape():
+    assert validate("meeting_strategy", '{"talking_points": "not a list"}') is None
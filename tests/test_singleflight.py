@@ -0,0 +1,91 @@
+import threading
+import time
+import pytest
+import governor
+from singleflight import Group
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def _follow(group, key, func, results):
+    def run():
+        try:
+            results.append(group.do(key, func))
+        except Exception as e:
+            results.append(e)
+    thread = threading.Thread(target=run)
+    thread.start()
+    _wait_for(lambda: group.stats()["followers"] >= 1)
+    return thread
+
+
+def test_concurrent_callers_share_one_call_and_get_copies():
+    group = Group("test")
+    release = threading.Event()
+    calls = []
+
+    def leader():
+        calls.append("leader")
+        release.wait(5)
+        return {"items": [1]}
+
+    results = []
+    thread = threading.Thread(target=lambda: results.append(group.do("k", leader)))
+    thread.start()
+    _wait_for(lambda: group.stats()["in_flight"] == 1)
+    follower = _follow(group, "k", lambda: calls.append("follower"), results)
+    release.set()
+    thread.join(5)
+    follower.join(5)
+
+    assert calls == ["leader"]
+    assert results == [{"items": [1]}, {"items": [1]}]
+    assert results[0] is not results[1]
+
+
+def test_follower_retries_when_leader_hits_its_budget():
+    group = Group("test")
+    release = threading.Event()
+
+    def leader():
+        release.wait(5)
+        raise governor.BudgetExceeded("leader's deadline reached")
+
+    errors = []
+    thread = threading.Thread(target=lambda: errors.append(pytest.raises(governor.BudgetExceeded, group.do, "k", leader)))
+    thread.start()
+    _wait_for(lambda: group.stats()["in_flight"] == 1)
+    results = []
+    follower = _follow(group, "k", lambda: "follower's own result", results)
+    release.set()
+    thread.join(5)
+    follower.join(5)
+
+    assert len(errors) == 1
+    assert results == ["follower's own result"]
+    assert group.stats()["leaders"] == 2
+
+
+def test_follower_shares_other_errors():
+    group = Group("test")
+    release = threading.Event()
+
+    def leader():
+        release.wait(5)
+        raise RuntimeError("provider down")
+
+    thread = threading.Thread(target=lambda: pytest.raises(RuntimeError, group.do, "k", leader))
+    thread.start()
+    _wait_for(lambda: group.stats()["in_flight"] == 1)
+    results = []
+    follower = _follow(group, "k", lambda: "unused", results)
+    release.set()
+    thread.join(5)
+    follower.join(5)
+
+    assert isinstance(results[0], RuntimeError)
@@ -1,60 +1,176 @@
 # tools/ExaSearchTool.py
 
+import ast
+import contextvars
+import functools
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from exa_py import Exa
-from langchain.agents import Tool  # For crewai v0.11.0
+from langchain.tools import StructuredTool
+from cache import CACHE_ENABLED, cached, get_cache
+from metrics import timed_tool
+from ratelimit import rate_limited
+from singleflight import coalesced
+import evidence
 
-exa = Exa(api_key=os.environ["EXA_API_KEY"])
+EXA_BASE_URL = os.getenv("EXA_BASE_URL", "https://api.exa.ai")
+EXA_CONTENT_MAX_CHARS = int(os.getenv("EXA_CONTENT_MAX_CHARS", "1000"))
+EXA_CONTENT_BATCH_SIZE = int(os.getenv("EXA_CONTENT_BATCH_SIZE", "5"))
+EXA_CONTENT_CONCURRENCY = int(os.getenv("EXA_CONTENT_CONCURRENCY", "4"))
 
-def search(query: str):
-    try:
-        raw_results = exa.search(query, use_autoprompt=True, num_results=3)
+@functools.lru_cache(maxsize=None)
+def get_exa_client() -> Exa:
+    """Create the Exa client on first use so importing this module never needs the key."""
+    api_key = os.getenv("EXA_API_KEY")
+    if not api_key:
+        raise RuntimeError("EXA_API_KEY is not set")
+    return Exa(api_key=api_key, base_url=EXA_BASE_URL)
+
+def _clean_results(raw_results):
+    cleaned_results = []
+    for r in raw_results.results:
+        cleaned_results.append({
+            "id": getattr(r, "id", ""),
+            "title": getattr(r, "title", ""),
+            "url": getattr(r, "url", ""),
+            "text": getattr(r, "text", "")
+        })
+    return cleaned_results
+
+@timed_tool("search")
+@coalesced("exa_search")
+@cached("exa_search")
+@rate_limited("exa")
+def _search(query: str):
+    raw_results = get_exa_client().search(query, use_autoprompt=True, num_results=3)
+    return {"results": _clean_results(raw_results)}
+
+@timed_tool("find_similar")
+@coalesced("exa_find_similar", lower=False)
+@cached("exa_find_similar", lower=False)
+@rate_limited("exa")
+def _find_similar(url: str):
+    raw_results = get_exa_client().find_similar(url, num_results=3)
+    return {"results": _clean_results(raw_results)}
+
+def parse_ids(ids) -> list:
+    """Accept a list, a JSON/Python list literal or a comma-separated string; dedupe in order."""
+    if isinstance(ids, str):
+        text = ids.strip()
+        if text.startswith("["):
+            try:
+                ids = json.loads(text)
+            except ValueError:
+                ids = ast.literal_eval(text)
+        else:
+            ids = text.replace("\n", ",").split(",")
+
+    unique = []
+    for id_ in ids:
+        id_ = str(id_).strip().strip("'\"")
+        if id_ and id_ not in unique:
+            unique.append(id_)
+    return unique
+
+@timed_tool("get_contents")
+@coalesced("exa_contents", lower=False)
+@rate_limited("exa")
+def _fetch_batch(batch: list) -> dict:
+    # Let Exa truncate server-side instead of downloading whole pages
+    response = get_exa_client().get_contents(batch, text={"max_characters": EXA_CONTENT_MAX_CHARS})
+    return {r.id: (r.text or "") for r in response.results}
+
+def iter_contents(ids):
+    """Yield (id, text) pairs as they become available.
+
+    Ids already in the content store are yielded first; the rest are fetched in
+    batches of EXA_CONTENT_BATCH_SIZE with up to EXA_CONTENT_CONCURRENCY requests
+    in flight, and each batch is yielded (and stored) as soon as it completes.
+    """
+    store = get_cache() if CACHE_ENABLED else None
+    missing = []
+    for id_ in parse_ids(ids):
+        text = store.get("exa_contents", id_) if store else None
+        if text is None:
+            missing.append(id_)
+        else:
+            yield id_, text
 
-        cleaned_results = []
-        for r in raw_results.results:
-            cleaned_results.append({
-                "id": getattr(r, "id", ""),
-                "title": getattr(r, "title", ""),
-                "url": getattr(r, "url", ""),
-                "text": getattr(r, "text", "")
-            })
+    batches = [missing[i:i + EXA_CONTENT_BATCH_SIZE] for i in range(0, len(missing), EXA_CONTENT_BATCH_SIZE)]
+    if not batches:
+        return
 
-        return {"results": cleaned_results}
+    with ThreadPoolExecutor(max_workers=min(EXA_CONTENT_CONCURRENCY, len(batches)), thread_name_prefix="exa") as pool:
+        futures = {pool.submit(contextvars.copy_context().run, _fetch_batch, batch): batch for batch in batches}
+        for future in as_completed(futures):
+            try:
+                fetched = future.result()
+            except Exception as e:
+                for id_ in futures[future]:
+                    yield id_, f"⚠️ Error fetching contents: {e}"
+                continue
+            for id_ in futures[future]:
+                text = fetched.get(id_, "")
+                if store and id_ in fetched:
+                    store.set("exa_contents", id_, text)
+                yield id_, text
 
+def search(query: str):
+    store = evidence.current()
+    if store is not None:
+        hits = store.lookup(query)
+        if hits is not None:
+            return {"results": hits, "source": "evidence"}
+    try:
+        results = _search(query)
     except Exception as e:
         return {"results": [], "error": str(e)}
+    if store is not None:
+        store.add_results(results["results"])
+    return results
 
 def find_similar(url: str):
     try:
-        return exa.find_similar(url, num_results=3)
+        results = _find_similar(url)
     except Exception as e:
         return {"results": [], "error": str(e)}
+    store = evidence.current()
+    if store is not None:
+        store.add_results(results["results"])
+    return results
+
+def search_evidence(query: str):
+    """Query pages already found by any agent during this run, without calling Exa."""
+    store = evidence.current()
+    if store is None:
+        return {"results": []}
+    return {"results": store.search(query, k=5)}
 
 def get_contents(ids: str):
     try:
-        # Convert from string to list if needed
-        if isinstance(ids, str):
-            ids = eval(ids)
-
-        results = exa.get_contents(ids)
-
-        contents = []
-        for r in results:
-            if hasattr(r, "text"):
-                contents.append(r.text[:1000])
-            elif isinstance(r, dict) and "text" in r:
-                contents.append(r["text"][:1000])
-            else:
-                contents.append(str(r)[:1000])  # fallback
-
-        return "\n\n".join(contents)
-
+        order = parse_ids(ids)
+        contents = dict(iter_contents(order))
+        store = evidence.current()
+        if store is not None:
+            for id_, text in contents.items():
+                if text and not text.startswith("⚠️"):
+                    store.add(id_, text=text)
+        return "\n\n".join(contents[id_] for id_ in order if contents.get(id_))
     except Exception as e:
         return f"⚠️ Error fetching contents: {e}"
 
-def get_exa_tools():
+@functools.lru_cache(maxsize=None)
+def _exa_tools():
+    # Structured tools advertise the real parameter names, which crewai passes back as keyword arguments
     return [
-        Tool(name="Search", func=search, description="Search webpages for a query using Exa"),
-        Tool(name="FindSimilar", func=find_similar, description="Find similar pages to a given URL"),
-        Tool(name="GetContents", func=get_contents, description="Get webpage contents for given IDs")
+        StructuredTool.from_function(name="SearchEvidence", func=search_evidence,
+                                     description="Search pages the team has ALREADY found during this brief (no network). Try this before Search."),
+        StructuredTool.from_function(name="Search", func=search, description="Search webpages for a query using Exa"),
+        StructuredTool.from_function(name="FindSimilar", func=find_similar, description="Find similar pages to a given URL"),
+        StructuredTool.from_function(name="GetContents", func=get_contents, description=f"Get webpage contents (first {EXA_CONTENT_MAX_CHARS} characters) for a list of result IDs")
     ]
+
+def get_exa_tools():
+    # Tools are stateless, so every agent shares one set built per process
+    return list(_exa_tools())
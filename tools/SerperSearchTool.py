@@ -1,50 +1,117 @@
+import contextvars
+import functools
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from langchain.tools import Tool
+from requests.adapters import HTTPAdapter
+from langchain.tools import StructuredTool
+from cache import cached
+from metrics import timed_tool
+from ratelimit import rate_limited
+from singleflight import coalesced
 
 SERPER_API_KEY = os.getenv("SERPER_API_KEY")
-SERPER_ENDPOINT = "https://google.serper.dev/search"
+SERPER_ENDPOINT = os.getenv("SERPER_ENDPOINT", "https://google.serper.dev/search")
+SERPER_MAX_CONCURRENCY = int(os.getenv("SERPER_MAX_CONCURRENCY", "8"))
 
-def search_with_serper(query: str) -> str:
-    """Search Google using Serper API and return top LinkedIn results."""
+# One keep-alive pool shared by every lookup so repeated calls skip the TLS handshake
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=SERPER_MAX_CONCURRENCY))
+
+@timed_tool("search_with_serper")
+@coalesced("serper")
+@cached("serper")
+@rate_limited("serper")
+def _lookup(query: str) -> dict:
+    """Run one Serper query and extract the LinkedIn URL and snippets."""
     headers = {
         "X-API-KEY": SERPER_API_KEY,
         "Content-Type": "application/json"
     }
     payload = {"q": f"{query} site:linkedin.com/in"}
 
-    try:
-        response = requests.post(SERPER_ENDPOINT, headers=headers, json=payload)
-        response.raise_for_status()
-        data = response.json()
+    response = _session.post(SERPER_ENDPOINT, headers=headers, json=payload)
+    response.raise_for_status()
+    data = response.json()
 
-        results = data.get("organic", [])[:3]
+    results = data.get("organic", [])[:3]
 
-        person_info = {
-            "name": query,
-            "linkedin_url": None,
-            "snippets": []
-        }
+    person_info = {
+        "name": query,
+        "linkedin_url": None,
+        "snippets": []
+    }
 
-        for result in results:
-            link = result.get("link", "")
-            snippet = result.get("snippet", "")
-            if "linkedin.com/in" in link and not person_info["linkedin_url"]:
-                person_info["linkedin_url"] = link
-            if snippet:
-                person_info["snippets"].append(snippet)
+    for result in results:
+        link = result.get("link", "")
+        snippet = result.get("snippet", "")
+        if "linkedin.com/in" in link and not person_info["linkedin_url"]:
+            person_info["linkedin_url"] = link
+        if snippet:
+            person_info["snippets"].append(snippet)
 
-        return json.dumps(person_info)  # always stringified for LLM use
+    return person_info
 
+def search_with_serper(query: str) -> str:
+    """Search Google using Serper API and return top LinkedIn results."""
+    try:
+        return json.dumps(dict(_lookup(query), name=query))  # always stringified for LLM use
     except Exception as e:
         return json.dumps({"error": f"❌ Serper search failed: {str(e)}"})
 
-def get_serper_tools():
+def parse_participants(participants) -> list:
+    """Split a comma/newline separated participant string into unique names."""
+    if isinstance(participants, str):
+        participants = participants.replace("\n", ",").split(",")
+
+    names = []
+    for name in participants:
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+def _lookup_safe(name: str) -> dict:
+    try:
+        return dict(_lookup(name), name=name)
+    except Exception as e:
+        return {"name": name, "linkedin_url": None, "snippets": [], "error": f"❌ Serper search failed: {str(e)}"}
+
+def lookup_participants(participants, max_concurrency: int = SERPER_MAX_CONCURRENCY) -> list:
+    """Look up every participant concurrently, preserving input order."""
+    names = parse_participants(participants)
+    if not names:
+        return []
+
+    workers = max(1, min(max_concurrency, len(names)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="serper") as pool:
+        # Copy the caller's context so run-scoped state (progress stage etc.) follows each lookup
+        futures = [pool.submit(contextvars.copy_context().run, _lookup_safe, name) for name in names]
+        return [future.result() for future in futures]
+
+def search_participants_with_serper(participants: str) -> str:
+    """Search LinkedIn bios for a whole comma-separated participant list in one call."""
+    return json.dumps(lookup_participants(participants))
+
+@functools.lru_cache(maxsize=None)
+def _serper_tools():
+    # Structured tools advertise the real parameter names, which crewai passes back as keyword arguments
     return [
-        Tool.from_function(
+        StructuredTool.from_function(
+            func=search_participants_with_serper,
+            name="SerperBatchSearch",
+            description="Searches Google for LinkedIn bios and profile URLs of ALL participants at once. "
+                        "Input is the full comma-separated list of participant names; returns a JSON list "
+                        "of {name, linkedin_url, snippets} records."
+        ),
+        StructuredTool.from_function(
             func=search_with_serper,
             name="SerperSearch",
             description="Searches Google for LinkedIn bios and profile URLs using the Serper API."
         )
     ]
+
+def get_serper_tools():
+    # Tools are stateless, so every agent shares one set built per process
+    return list(_serper_tools())